@@ -10,6 +10,8 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
+from collections import Counter
+from operator import itemgetter
 import logging
 from pathlib import Path
 import threading
@@ -35,7 +37,23 @@ CONFIG = {
     'INSIGHT_TIME_PERIOD_DAYS': 7,
     'RECENT_MEMORIES_LIMIT': 50,
     'TOP_INSIGHTS_LIMIT': 10,
-    'STRESS_ALERT_MEMORY_COUNT': 5
+    'STRESS_ALERT_MEMORY_COUNT': 5,
+    'RETENTION_HALF_LIFE_HOURS': 168.0  # Importance halves after a week without recall
+}
+
+# Ranking weights for SmartInsightEngine, built once instead of per ranking call
+INSIGHT_IMPORTANCE_WEIGHTS = {
+    'critical': 1.0,
+    'high': 0.8,
+    'medium': 0.6,
+    'low': 0.4
+}
+
+INSIGHT_TYPE_WEIGHTS = {
+    'warning': 1.0,
+    'achievement': 0.9,
+    'recommendation': 0.8,
+    'pattern': 0.7
 }
 
 logger = logging.getLogger(__name__)
@@ -52,6 +70,65 @@ class MemoryInsight:
     data_points: List[Dict]
     created_at: datetime
 
+@dataclass
+class MemorySnapshot:
+    """Column-wise view of the memories behind one insight run"""
+    count: int
+    location_labels: List[str]  # Distinct locations in first-seen order
+    location_codes: np.ndarray  # Index into location_labels per memory
+    engagement: np.ndarray
+    stress: np.ndarray
+    importance: np.ndarray
+    hours: np.ndarray
+    dates: np.ndarray
+    emotions: List[str]
+    ages: np.ndarray  # Seconds between each memory's timestamp and the snapshot
+
+    @classmethod
+    def from_memories(cls, memories: List[Memory], now: Optional[float] = None) -> 'MemorySnapshot':
+        """Extract every field the analyzers need in a single pass"""
+        locations, engagement, stress = [], [], []
+        importance, hours, dates, emotions, epochs = [], [], [], [], []
+
+        for memory in memories:
+            context = memory.context_data
+            movement = memory.movement_data
+            timestamp = memory.timestamp
+
+            locations.append(context.get('environmental', {}).get('venue_type', 'unknown') if context else 'unknown')
+            stress.append(context.get('biometric', {}).get('stress_score', 0.5) if context else 0.5)
+            engagement.append(movement.get('engagement_level', 0.5) if movement else 0.5)
+            importance.append(memory.importance_score)
+            hours.append(timestamp.hour)
+            dates.append(timestamp.date())
+            epochs.append(timestamp.timestamp())
+            emotions.append(memory.emotion)
+
+        location_index: Dict[str, int] = {}
+        location_codes = [location_index.setdefault(location, len(location_index)) for location in locations]
+
+        return cls(
+            count=len(locations),
+            location_labels=list(location_index),
+            location_codes=np.asarray(location_codes, dtype=np.int64),
+            engagement=np.asarray(engagement, dtype=np.float64),
+            stress=np.asarray(stress, dtype=np.float64),
+            importance=np.asarray(importance, dtype=np.float64),
+            hours=np.asarray(hours, dtype=np.int64),
+            dates=np.array(dates, dtype='datetime64[D]'),
+            emotions=emotions,
+            ages=(time.time() if now is None else now) - np.asarray(epochs, dtype=np.float64)
+        )
+
+    def retention(self, half_life_hours: Optional[float] = None) -> np.ndarray:
+        """Ebbinghaus-style retention: importance decayed exponentially with age"""
+        if half_life_hours is None:
+            half_life_hours = CONFIG['RETENTION_HALF_LIFE_HOURS']
+        if half_life_hours <= 0:
+            raise ValueError("half_life_hours must be positive")
+        decay_rate = np.log(2) / (half_life_hours * 3600.0)
+        return self.importance * np.exp(-decay_rate * self.ages)
+
 @dataclass
 class MemoryNotification:
     """Smart notifications based on memory analysis"""
@@ -442,6 +519,15 @@ class SmartInsightEngine:
     def __init__(self, memory_processor: MemoryProcessor):
         self.memory_processor = memory_processor
         self.insight_history = []
+        
+        # (minimum memories, analyzer); below its minimum an analyzer cannot produce an insight
+        self.insight_analyzers = [
+            (3, self._analyze_engagement_patterns),
+            (2, self._analyze_stress_patterns),
+            (3, self._analyze_location_performance),
+            (5, self._analyze_temporal_patterns),
+            (1, self._analyze_emotion_trends)
+        ]
     
     def generate_insights(self, time_period: int = 7) -> List[MemoryInsight]:
         """Generate AI insights from recent memories"""
@@ -460,42 +546,39 @@ class SmartInsightEngine:
         if not memories:
             return insights
         
-        # Pattern analysis
-        insights.extend(self._analyze_engagement_patterns(memories))
-        insights.extend(self._analyze_stress_patterns(memories))
-        insights.extend(self._analyze_location_performance(memories))
-        insights.extend(self._analyze_temporal_patterns(memories))
-        insights.extend(self._analyze_emotion_trends(memories))
+        # Extract the analyzed fields once, then run pattern analysis on the columns
+        snapshot = MemorySnapshot.from_memories(memories)
+        for min_memories, analyze in self.insight_analyzers:
+            if snapshot.count >= min_memories:
+                insights.extend(analyze(snapshot))
         
         # Filter and rank insights
         insights = self._rank_insights(insights)
         
         return insights[:10]  # Return top 10 insights
     
-    def _analyze_engagement_patterns(self, memories: List[Memory]) -> List[MemoryInsight]:
+    @staticmethod
+    def _group_means(codes: np.ndarray, values: np.ndarray, labels: List[Any], min_samples: int) -> Dict[Any, float]:
+        """Average values per group code, dropping groups with too few samples"""
+        counts = np.bincount(codes, minlength=len(labels))
+        totals = np.bincount(codes, weights=values, minlength=len(labels))
+        return {
+            labels[code]: totals[code] / counts[code]
+            for code in np.flatnonzero(counts >= min_samples)
+        }
+    
+    def _analyze_engagement_patterns(self, snapshot: MemorySnapshot) -> List[MemoryInsight]:
         """Analyze engagement level patterns"""
         insights = []
         
-        # Calculate engagement by location
-        location_engagement = {}
-        for memory in memories:
-            location = memory.context_data.get('environmental', {}).get('venue_type', 'unknown') if memory.context_data else 'unknown'
-            engagement = memory.movement_data.get('engagement_level', 0.5) if memory.movement_data else 0.5
-            
-            if location not in location_engagement:
-                location_engagement[location] = []
-            location_engagement[location].append(engagement)
-        
-        # Find best location for engagement
-        location_averages = {
-            loc: np.mean(engagements) 
-            for loc, engagements in location_engagement.items()
-            if len(engagements) >= 3  # Minimum samples
-        }
+        # Calculate engagement by location, keeping at least 3 samples per location
+        location_averages = self._group_means(
+            snapshot.location_codes, snapshot.engagement, snapshot.location_labels, min_samples=3
+        )
         
         if location_averages:
-            best_location = max(location_averages.items(), key=lambda x: x[1])
-            worst_location = min(location_averages.items(), key=lambda x: x[1])
+            best_location = max(location_averages.items(), key=itemgetter(1))
+            worst_location = min(location_averages.items(), key=itemgetter(1))
             
             if best_location[1] - worst_location[1] > 0.2:  # Significant difference
                 insights.append(MemoryInsight(
@@ -518,30 +601,24 @@ class SmartInsightEngine:
         
         return insights
     
-    def _analyze_stress_patterns(self, memories: List[Memory]) -> List[MemoryInsight]:
+    def _analyze_stress_patterns(self, snapshot: MemorySnapshot) -> List[MemoryInsight]:
         """Analyze stress level patterns"""
         insights = []
         
-        # Analyze stress by time of day
-        hourly_stress = {}
-        for memory in memories:
-            hour = memory.timestamp.hour
-            stress = memory.context_data.get('biometric', {}).get('stress_score', 0.5) if memory.context_data else 0.5
-            
-            if hour not in hourly_stress:
-                hourly_stress[hour] = []
-            hourly_stress[hour].append(stress)
+        # Analyze stress by time of day with one histogram pass per column
+        hourly_counts = np.bincount(snapshot.hours, minlength=24)
+        hourly_totals = np.bincount(snapshot.hours, weights=snapshot.stress, minlength=24)
         
         # Find peak stress hours
+        sampled_hours = np.flatnonzero(hourly_counts >= 2)
         hourly_averages = {
-            hour: np.mean(stresses)
-            for hour, stresses in hourly_stress.items()
-            if len(stresses) >= 2
+            int(hour): hourly_totals[hour] / hourly_counts[hour]
+            for hour in sampled_hours
         }
         
         if hourly_averages:
-            peak_stress_hour = max(hourly_averages.items(), key=lambda x: x[1])
-            low_stress_hour = min(hourly_averages.items(), key=lambda x: x[1])
+            peak_stress_hour = max(hourly_averages.items(), key=itemgetter(1))
+            low_stress_hour = min(hourly_averages.items(), key=itemgetter(1))
             
             if peak_stress_hour[1] > 0.6:  # High stress threshold
                 insights.append(MemoryInsight(
@@ -564,29 +641,17 @@ class SmartInsightEngine:
         
         return insights
     
-    def _analyze_location_performance(self, memories: List[Memory]) -> List[MemoryInsight]:
+    def _analyze_location_performance(self, snapshot: MemorySnapshot) -> List[MemoryInsight]:
         """Analyze location-based performance"""
         insights = []
         
-        # Analyze importance scores by location
-        location_importance = {}
-        for memory in memories:
-            location = memory.context_data.get('environmental', {}).get('venue_type', 'unknown') if memory.context_data else 'unknown'
-            importance = memory.importance_score
-            
-            if location not in location_importance:
-                location_importance[location] = []
-            location_importance[location].append(importance)
-        
-        # Find most productive locations
-        location_averages = {
-            loc: np.mean(scores)
-            for loc, scores in location_importance.items()
-            if len(scores) >= 3
-        }
+        # Find most productive locations from importance averaged over at least 3 memories
+        location_averages = self._group_means(
+            snapshot.location_codes, snapshot.importance, snapshot.location_labels, min_samples=3
+        )
         
         if location_averages:
-            best_location = max(location_averages.items(), key=lambda x: x[1])
+            best_location = max(location_averages.items(), key=itemgetter(1))
             
             if best_location[1] > 0.7:  # High importance threshold
                 insights.append(MemoryInsight(
@@ -609,29 +674,16 @@ class SmartInsightEngine:
         
         return insights
     
-    def _analyze_temporal_patterns(self, memories: List[Memory]) -> List[MemoryInsight]:
+    def _analyze_temporal_patterns(self, snapshot: MemorySnapshot) -> List[MemoryInsight]:
         """Analyze time-based patterns"""
         insights = []
         
-        # Analyze engagement trends over time
-        daily_engagement = {}
-        for memory in memories:
-            date = memory.timestamp.date()
-            engagement = memory.movement_data.get('engagement_level', 0.5) if memory.movement_data else 0.5
-            
-            if date not in daily_engagement:
-                daily_engagement[date] = []
-            daily_engagement[date].append(engagement)
-        
-        # Calculate daily averages
-        daily_averages = {
-            date: np.mean(engagements)
-            for date, engagements in daily_engagement.items()
-        }
+        # Analyze engagement trends over time; np.unique sorts the days once and
+        # maps every memory to its day for the per-day averages
+        dates, day_index = np.unique(snapshot.dates, return_inverse=True)
         
-        if len(daily_averages) >= 5:  # Need enough data points
-            dates = sorted(daily_averages.keys())
-            values = [daily_averages[date] for date in dates]
+        if len(dates) >= 5:  # Need enough data points
+            values = np.bincount(day_index, weights=snapshot.engagement) / np.bincount(day_index)
             
             # Simple trend analysis
             recent_avg = np.mean(values[-3:])  # Last 3 days
@@ -650,29 +702,28 @@ class SmartInsightEngine:
                         "Document successful strategies"
                     ],
                     data_points=[
-                        {"date": str(date), "engagement": daily_averages[date]}
-                        for date in dates[-7:]  # Last week
+                        {"date": date, "engagement": value}
+                        for date, value in zip(
+                            np.datetime_as_string(dates[-7:], unit='D').tolist(),  # Last week
+                            values[-7:]
+                        )
                     ],
                     created_at=datetime.now()
                 ))
         
         return insights
     
-    def _analyze_emotion_trends(self, memories: List[Memory]) -> List[MemoryInsight]:
+    def _analyze_emotion_trends(self, snapshot: MemorySnapshot) -> List[MemoryInsight]:
         """Analyze emotion trends"""
         insights = []
         
-        # Count emotions
-        emotion_counts = {}
-        total_memories = len(memories)
+        # Count emotions in a single C-level pass
+        emotion_counts = Counter(snapshot.emotions)
+        total_memories = snapshot.count
         
-        for memory in memories:
-            emotion = memory.emotion
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        # Find dominant emotion
+        # Find dominant emotion (first seen wins ties)
         if emotion_counts:
-            dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])
+            dominant_emotion = emotion_counts.most_common(1)[0]
             percentage = (dominant_emotion[1] / total_memories) * 100
             
             if percentage > 40:  # Dominant emotion threshold
@@ -709,26 +760,10 @@ class SmartInsightEngine:
     def _rank_insights(self, insights: List[MemoryInsight]) -> List[MemoryInsight]:
         """Rank insights by importance and relevance"""
         
-        importance_weights = {
-            'critical': 1.0,
-            'high': 0.8,
-            'medium': 0.6,
-            'low': 0.4
-        }
-        
-        type_weights = {
-            'warning': 1.0,
-            'achievement': 0.9,
-            'recommendation': 0.8,
-            'pattern': 0.7
-        }
-        
         def calculate_score(insight):
-            importance_score = importance_weights.get(insight.importance, 0.5)
-            type_score = type_weights.get(insight.insight_type, 0.5)
-            confidence_score = insight.confidence
-            
-            return importance_score * type_score * confidence_score
+            return (INSIGHT_IMPORTANCE_WEIGHTS.get(insight.importance, 0.5)
+                    * INSIGHT_TYPE_WEIGHTS.get(insight.insight_type, 0.5)
+                    * insight.confidence)
         
         insights.sort(key=calculate_score, reverse=True)
         return insights
@@ -17,8 +17,9 @@ import uuid
 import time
 import logging
 import torch
-from typing import List
+from typing import List, Optional
 from memory_model import Memory
+from memory_utils import match_keywords, TEXT_IMPORTANCE_KEYWORDS, TEXT_TAG_KEYWORDS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -227,6 +228,10 @@ class AudioMemoryAssistant:
         memory_id = str(uuid.uuid4())
         timestamp = time.time()
         
+        # One keyword scan feeds both tagging and importance
+        keywords = match_keywords(text)
+        tags = self._generate_tags(text, emotion_label, keywords)
+        
         # Create enhanced memory structure for the multimodal system
         memory = Memory(
             id=memory_id,
@@ -235,9 +240,9 @@ class AudioMemoryAssistant:
             timestamp=datetime.fromtimestamp(timestamp),
             emotion=emotion_label,
             emotion_scores={emotion_label: emotion_score},
-            tags=self._generate_tags(text, emotion_label),
+            tags=tags,
             topics=[str(t) for t in topic_ids],
-            importance_score=self._calculate_importance(text, emotion_score),
+            importance_score=self._calculate_importance(text, emotion_score, keywords),
             embedding=embedding.tolist(),
             enhanced_embedding=embedding.tolist(),
             source_type='audio',
@@ -264,7 +269,7 @@ class AudioMemoryAssistant:
                     'focus_quality': float(np.random.uniform(0.4, 0.8))
                 }
             },
-            searchable_tags=self._generate_tags(text, emotion_label)
+            searchable_tags=list(tags)
         )
         
         # 6. Store in SQL database for backup with error handling
@@ -332,7 +337,7 @@ class AudioMemoryAssistant:
         else:
             return max(base_stress - (confidence - 0.5) * 0.2, 0.0)
     
-    def _calculate_importance(self, text: str, emotion_score: float) -> float:
+    def _calculate_importance(self, text: str, emotion_score: float, keywords: Optional[frozenset] = None) -> float:
         """Calculate memory importance score"""
         importance = 0.5  # Base importance
         
@@ -341,32 +346,26 @@ class AudioMemoryAssistant:
             importance += 0.1
         
         # Keyword importance
-        important_keywords = ['important', 'urgent', 'deadline', 'decision', 'critical', 'meeting']
-        for keyword in important_keywords:
-            if keyword.lower() in text.lower():
-                importance += 0.1
-                break
+        if keywords is None:
+            keywords = match_keywords(text)
+        if not keywords.isdisjoint(TEXT_IMPORTANCE_KEYWORDS):
+            importance += 0.1
         
         # Emotion intensity
         importance += emotion_score * 0.2
         
         return min(importance, 1.0)
     
-    def _generate_tags(self, text: str, emotion: str) -> List[str]:
+    def _generate_tags(self, text: str, emotion: str, keywords: Optional[frozenset] = None) -> List[str]:
         """Generate searchable tags"""
         tags = [emotion]
-        
-        text_lower = text.lower()
+        if keywords is None:
+            keywords = match_keywords(text)
         
         # Topic tags
-        if any(word in text_lower for word in ['meeting', 'discussion', 'call']):
-            tags.append('meeting')
-        
-        if any(word in text_lower for word in ['project', 'work', 'task']):
-            tags.append('work')
-        
-        if any(word in text_lower for word in ['decision', 'choose', 'decide']):
-            tags.append('decision')
+        for tag, words in TEXT_TAG_KEYWORDS.items():
+            if not keywords.isdisjoint(words):
+                tags.append(tag)
         
         # Time-based tags
         hour = datetime.now().hour
@@ -5,6 +5,7 @@ This module handles uploading and downloading files to/from GCS.
 
 from google.cloud import storage
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
 import os
 from pathlib import Path
 import logging
@@ -13,6 +14,13 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# HTTP connection pool settings shared by all requests made through the client
+STORAGE_CONFIG = {
+    'POOL_CONNECTIONS': int(os.getenv('GCS_POOL_CONNECTIONS', '200')),
+    'POOL_MAXSIZE': int(os.getenv('GCS_POOL_MAXSIZE', '200')),
+    'MAX_RETRIES': 3
+}
+
 class CloudStorage:
     """Handle Google Cloud Storage operations for audio files and other media."""
     
@@ -40,7 +48,8 @@ class CloudStorage:
             else:
                 # Use application default credentials
                 self.client = storage.Client()
-                
+
+            self._configure_http_pool()
             self.bucket = self.client.bucket(self.bucket_name)
             logger.info(f"Connected to GCS bucket: {self.bucket_name}")
         except Exception as e:
@@ -48,6 +57,15 @@ class CloudStorage:
             self.client = None
             self.bucket = None
     
+    def _configure_http_pool(self):
+        """Mount a larger keep-alive connection pool on the client's HTTP session."""
+        adapter = HTTPAdapter(
+            pool_connections=STORAGE_CONFIG['POOL_CONNECTIONS'],
+            pool_maxsize=STORAGE_CONFIG['POOL_MAXSIZE'],
+            max_retries=STORAGE_CONFIG['MAX_RETRIES']
+        )
+        self.client._http.mount('https://', adapter)
+
     def is_available(self):
         """Check if GCS storage is available."""
         return self.client is not None and self.bucket is not None
@@ -109,26 +127,47 @@ class CloudStorage:
             logger.error(f"Failed to download from GCS: {e}")
             return None
     
-    def list_files(self, prefix=None):
+    def iter_files(self, prefix=None, page_size=1000):
         """
-        List files in the bucket with optional prefix.
-        
+        Lazily iterate over file names in the bucket, one page at a time.
+
+        Only the object name is requested from the API, so large buckets
+        can be walked without holding the whole listing in memory.
+
         Args:
             prefix: Filter by prefix (folder)
-            
-        Returns:
-            List of file names or empty list if failed
+            page_size: Number of objects to fetch per API page
+
+        Yields:
+            File names; stops early if listing fails
         """
         if not self.is_available():
             logger.warning("GCS storage not available, cannot list files")
-            return []
-            
+            return
+
         try:
-            blobs = self.client.list_blobs(self.bucket_name, prefix=prefix)
-            return [blob.name for blob in blobs]
+            blobs = self.client.list_blobs(
+                self.bucket_name,
+                prefix=prefix,
+                page_size=page_size,
+                fields='items/name,nextPageToken'
+            )
+            for blob in blobs:
+                yield blob.name
         except Exception as e:
             logger.error(f"Failed to list files in GCS: {e}")
-            return []
+
+    def list_files(self, prefix=None):
+        """
+        List files in the bucket with optional prefix.
+
+        Args:
+            prefix: Filter by prefix (folder)
+
+        Returns:
+            List of file names or empty list if failed
+        """
+        return list(self.iter_files(prefix=prefix))
     
     def delete_file(self, gcs_path):
         """
@@ -168,5 +207,9 @@ def init_cloud_storage(bucket_name=None, credentials_path=None):
         CloudStorage instance
     """
     global storage_client
+    # Reuse the existing client (and its connection pool) if nothing changed
+    if (storage_client.is_available() and credentials_path is None
+            and bucket_name in (None, storage_client.bucket_name)):
+        return storage_client
     storage_client = CloudStorage(bucket_name, credentials_path)
     return storage_client
@@ -1,19 +1,32 @@
 # FastAPI HTTP API Layer - Complete Implementation
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Query, status, Response, Request
+from fastapi import FastAPI, HTTPException, Body, Depends, Query, status, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import RedirectResponse, ORJSONResponse, StreamingResponse
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional, Dict, Any
 import os
-import json
+import asyncio
+import time
+import orjson
 import tempfile
 import logging
+import threading
 import hashlib
-import magic
-from datetime import datetime, timedelta
+import struct
+import puremagic
+import aiofiles.os
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import FileTarget, ValueTarget
+from streaming_form_data.validators import MaxSizeValidator, ValidationError
+from cachetools import TTLCache
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
 
 # Import your custom modules
 from memory_utils import MemoryProcessor
@@ -28,21 +41,120 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _env_list(name: str, default: str) -> tuple:
+    """Read a comma-separated env var once into a tuple, dropping blank entries"""
+    return tuple(item.strip() for item in os.getenv(name, default).split(',') if item.strip())
+
 # Security and configuration constants
 SECURITY_CONFIG = {
     'MAX_FILE_SIZE': int(os.getenv('MAX_FILE_SIZE', '50_000_000')),  # 50MB default
-    'ALLOWED_AUDIO_TYPES': {
+    'ALLOWED_AUDIO_TYPES': frozenset({
         'audio/mpeg', 'audio/wav', 'audio/x-wav', 'audio/mp4', 
         'audio/m4a', 'audio/ogg', 'audio/flac', 'audio/webm'
-    },
-    'ALLOWED_ORIGINS': os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:8080').split(','),
-    'UPLOAD_CHUNK_SIZE': 8192,  # 8KB chunks for streaming
+    }),
+    'ALLOWED_AUDIO_EXTENSIONS': frozenset({'.mp3', '.wav', '.m4a', '.ogg', '.flac', '.webm', '.mp4'}),
+    # Exact-match origins as a frozenset so CORS checks are a hash lookup
+    'ALLOWED_ORIGINS': frozenset(_env_list('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:8080')),
+    'ALLOWED_HOSTS': _env_list('ALLOWED_HOSTS', 'localhost'),
+    'ALLOWED_ORIGIN_REGEX': os.getenv('ALLOWED_ORIGIN_REGEX'),  # e.g. https://(app|www)\.example\.com
+    'DEV_ORIGIN_REGEX': r'http://(localhost|127\.0\.0\.1):(3000|8080)',
+    'CORS_ALLOWED_METHODS': ["GET", "POST", "PUT", "DELETE"],
+    'CORS_ALLOWED_HEADERS': ["Content-Type", "Authorization", "If-None-Match"],
+    # Container types puremagic reports for the allowed formats (webm/mp4 audio sniff as video)
+    'SNIFFED_AUDIO_TYPES': frozenset({
+        'audio/mpeg', 'audio/wav', 'audio/wave', 'audio/x-wav', 'audio/mp4', 'audio/ogg',
+        'application/ogg', 'audio/flac', 'audio/webm', 'video/webm', 'video/mp4'
+    }),
+    'SNIFF_BYTES': 512,
+    'UPLOAD_CHUNK_SIZE': int(os.getenv('UPLOAD_CHUNK_SIZE', str(1 << 20))),  # 1MB writes for streaming
+    'MULTIPART_OVERHEAD': 64 * 1024,  # Allowance for part headers and boundaries
     'TEMP_FILE_PREFIX': 'memori_upload_',
     'MAX_METADATA_SIZE': 10000,  # 10KB max metadata
     'RATE_LIMIT_REQUESTS': int(os.getenv('RATE_LIMIT_REQUESTS', '100')),
     'RATE_LIMIT_WINDOW': int(os.getenv('RATE_LIMIT_WINDOW', '60'))
 }
 
+# Hot-path aliases for the upload route, bound once instead of looked up per chunk
+_MAX_FILE_SIZE = SECURITY_CONFIG['MAX_FILE_SIZE']
+_MAX_METADATA_SIZE = SECURITY_CONFIG['MAX_METADATA_SIZE']
+_MAX_UPLOAD_BODY_SIZE = _MAX_FILE_SIZE + _MAX_METADATA_SIZE + SECURITY_CONFIG['MULTIPART_OVERHEAD']
+_UPLOAD_CHUNK_SIZE = SECURITY_CONFIG['UPLOAD_CHUNK_SIZE']
+_TEMP_FILE_PREFIX = SECURITY_CONFIG['TEMP_FILE_PREFIX']
+_SNIFF_BYTES = SECURITY_CONFIG['SNIFF_BYTES']
+_ALLOWED_AUDIO_MIMES = SECURITY_CONFIG['ALLOWED_AUDIO_TYPES']
+_ALLOWED_AUDIO_EXTS = SECURITY_CONFIG['ALLOWED_AUDIO_EXTENSIONS']
+_SNIFFED_AUDIO_MIMES = SECURITY_CONFIG['SNIFFED_AUDIO_TYPES']
+_FILE_TOO_LARGE_MESSAGE = f"File too large. Maximum size: {_MAX_FILE_SIZE} bytes"
+_INVALID_FILE_TYPE_MESSAGE = "Invalid file type. Allowed types: " + ", ".join(sorted(_ALLOWED_AUDIO_MIMES))
+_HTTP_400 = status.HTTP_400_BAD_REQUEST
+_HTTP_413 = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+_HTTP_500 = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+# Response caching for polled read-only endpoints
+CACHE_CONFIG = {
+    'ANALYTICS_TTL': int(os.getenv('ANALYTICS_CACHE_TTL', '30')),  # seconds
+    'ANALYTICS_MAX_ENTRIES': 64,
+    'HEALTH_TTL': float(os.getenv('HEALTH_CACHE_TTL', '5'))  # seconds
+}
+
+# Analytics results keyed by ETag; the TTL bounds drift of time-windowed queries
+analytics_cache = TTLCache(maxsize=CACHE_CONFIG['ANALYTICS_MAX_ENTRIES'], ttl=CACHE_CONFIG['ANALYTICS_TTL'])
+
+def _load_favicon() -> bytes:
+    """Read the favicon once at import; it never changes while running"""
+    favicon_path = Path(__file__).resolve().parent.parent / "static" / "favicon.ico"
+    if not favicon_path.is_file():
+        return b""
+    try:
+        return favicon_path.read_bytes()
+    except OSError as e:
+        logger.warning("Could not load favicon: %s", e)
+        return b""
+
+FAVICON_BYTES = _load_favicon()
+
+class CoarseClock:
+    """UTC wall clock refreshed by a background task for hot response paths
+    
+    Error bodies and export metadata only need second accuracy, so they read
+    the cached value instead of formatting a fresh timestamp per request.
+    Outside the app lifespan (no refresher running) it reads the real clock.
+    """
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._refresh()
+    
+    def _refresh(self):
+        self._now = datetime.utcnow()
+        self._iso = self._now.isoformat()
+    
+    async def _run(self):
+        while True:
+            self._refresh()
+            await asyncio.sleep(self.interval)
+    
+    def start(self):
+        """Start refreshing on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the refresher task"""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+    
+    def utcnow(self) -> datetime:
+        return self._now if self._task is not None else datetime.utcnow()
+    
+    def isoformat(self) -> str:
+        return self._iso if self._task is not None else datetime.utcnow().isoformat()
+
+clock = CoarseClock()
+
 # Application state manager
 class AppState:
     """Centralized application state management"""
@@ -50,21 +162,34 @@ class AppState:
         self.memory_processor: Optional[MemoryProcessor] = None
         self.audio_assistant: Optional[AudioMemoryAssistant] = None
         self._initialized = False
+        self._init_lock = threading.Lock()
     
-    async def initialize(self):
-        """Initialize application components"""
+    def _initialize_components(self):
+        """Build components exactly once, even when first requests race.
+        
+        Sync dependencies run in FastAPI's threadpool, so two requests can
+        arrive before startup finished; the lock keeps them from loading the
+        models twice.
+        """
         if self._initialized:
             return
-            
-        try:
-            logger.info("Initializing application components...")
-            self.memory_processor = MemoryProcessor()
-            self.audio_assistant = AudioMemoryAssistant(memory_processor=self.memory_processor)
-            self._initialized = True
-            logger.info("Application components initialized successfully")
-        except Exception as e:
-            logger.error("Failed to initialize application components: %s", e)
-            raise
+        
+        with self._init_lock:
+            if self._initialized:
+                return
+            try:
+                logger.info("Initializing application components...")
+                self.memory_processor = MemoryProcessor()
+                self.audio_assistant = AudioMemoryAssistant(memory_processor=self.memory_processor)
+                self._initialized = True
+                logger.info("Application components initialized successfully")
+            except Exception as e:
+                logger.error("Failed to initialize application components: %s", e)
+                raise
+    
+    async def initialize(self):
+        """Initialize application components"""
+        self._initialize_components()
     
     async def cleanup(self):
         """Clean up application resources"""
@@ -77,7 +202,18 @@ class AppState:
         except Exception as e:
             logger.error("Error during cleanup: %s", e)
     
+    def _ensure_initialized(self):
+        """Lazily initialize components when startup did not run"""
+        if self._initialized:
+            return
+        try:
+            self._initialize_components()
+        except Exception:
+            # Already logged; callers report the missing component as 503
+            pass
+    
     def get_memory_processor(self) -> MemoryProcessor:
+        self._ensure_initialized()
         if not self._initialized or not self.memory_processor:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -86,6 +222,7 @@ class AppState:
         return self.memory_processor
     
     def get_audio_assistant(self) -> AudioMemoryAssistant:
+        self._ensure_initialized()
         if not self._initialized or not self.audio_assistant:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -101,6 +238,11 @@ app_state = AppState()
 async def lifespan(app: FastAPI):
     """Manage application lifespan"""
     # Startup
+    loop = asyncio.get_running_loop()
+    if "uvloop" not in type(loop).__module__:
+        logger.warning("Not running on uvloop; upload and streaming throughput degraded. "
+                       "Launch with: uvicorn memory_api:app --loop uvloop --http httptools")
+    clock.start()
     await app_state.initialize()
     
     # Initialize Cloud Storage
@@ -115,13 +257,15 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     await app_state.cleanup()
+    await clock.stop()
 
 # FastAPI app with enhanced configuration
 app = FastAPI(
     title="Memori API",
     description="Secure Audio Memory Processing System",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Security middleware configuration
@@ -130,60 +274,130 @@ if os.getenv('ENVIRONMENT') == 'production':
     app.add_middleware(
         CORSMiddleware,
         allow_origins=SECURITY_CONFIG['ALLOWED_ORIGINS'],
-        allow_credentials=False,  # Don't allow credentials with wildcard origins
-        allow_methods=["GET", "POST", "PUT", "DELETE"],
-        allow_headers=["Content-Type", "Authorization"],
+        allow_origin_regex=SECURITY_CONFIG['ALLOWED_ORIGIN_REGEX'],
+        allow_credentials=False,
+        allow_methods=SECURITY_CONFIG['CORS_ALLOWED_METHODS'],
+        allow_headers=SECURITY_CONFIG['CORS_ALLOWED_HEADERS'],
+        expose_headers=["ETag"],
         max_age=3600,
     )
     
     # Add trusted host middleware for production
     app.add_middleware(
         TrustedHostMiddleware,
-        allowed_hosts=os.getenv('ALLOWED_HOSTS', 'localhost').split(',')
+        allowed_hosts=SECURITY_CONFIG['ALLOWED_HOSTS']
     )
 else:
-    # Development CORS configuration  
+    # Development CORS configuration: local frontends only, matched by a
+    # regex compiled once by the middleware instead of wildcard methods/headers
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["http://localhost:3000", "http://localhost:8080", "http://127.0.0.1:3000"],
+        allow_origin_regex=SECURITY_CONFIG['DEV_ORIGIN_REGEX'],
         allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_methods=SECURITY_CONFIG['CORS_ALLOWED_METHODS'],
+        allow_headers=SECURITY_CONFIG['CORS_ALLOWED_HEADERS'],
+        expose_headers=["ETag"],
+        max_age=3600,
     )
 
+# Compress large JSON/CSV bodies (lists, search, exports); small responses skip it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # File validation utilities
-def validate_file_type(file: UploadFile) -> bool:
-    """Validate file type using both content-type and magic numbers"""
+def _detect_shm_dir() -> Optional[str]:
+    """Return a writable tmpfs directory for staging uploads, if configured or present"""
+    shm_dir = os.getenv('UPLOAD_STAGING_DIR', '/dev/shm')
+    if os.path.isdir(shm_dir) and os.access(shm_dir, os.W_OK):
+        return shm_dir
+    return None
+
+_SHM_STAGING_DIR = _detect_shm_dir()
+
+def staging_dir_for(expected_size: Optional[int]) -> str:
+    """Stage uploads on tmpfs when they comfortably fit, on disk otherwise
+    
+    Bodies of unknown length (chunked encoding) always go to disk, and only
+    half the free tmpfs space is claimed so concurrent uploads cannot fill it.
+    """
+    if _SHM_STAGING_DIR and expected_size is not None:
+        try:
+            stats = os.statvfs(_SHM_STAGING_DIR)
+            if expected_size < stats.f_bavail * stats.f_frsize // 2:
+                return _SHM_STAGING_DIR
+        except OSError as e:
+            logger.warning("Could not stat upload staging dir: %s", e)
+    return tempfile.gettempdir()
+
+def validate_file_type(content_type: Optional[str], filename: Optional[str]) -> bool:
+    """Validate the client-declared content-type and file extension"""
     # Check content type
-    if not file.content_type or file.content_type not in SECURITY_CONFIG['ALLOWED_AUDIO_TYPES']:
+    if content_type not in _ALLOWED_AUDIO_MIMES:
         return False
     
-    # Additional validation could be added here with python-magic
-    # For now, we rely on content-type and file extension
-    if file.filename:
-        allowed_extensions = {'.mp3', '.wav', '.m4a', '.ogg', '.flac', '.webm', '.mp4'}
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        return file_ext in allowed_extensions
+    return not filename or os.path.splitext(filename)[1].lower() in _ALLOWED_AUDIO_EXTS
+
+def sniff_audio_types(head: bytes) -> set:
+    """Identify MIME types from the leading magic bytes of a file"""
+    try:
+        return {match.mime_type for match in puremagic.magic_string(head)}
+    except (puremagic.PureError, ValueError):
+        return set()
+
+class UnsupportedAudioError(Exception):
+    """Raised when an upload is rejected before its content is written"""
+
+class AudioUploadTarget(FileTarget):
+    """FileTarget that validates the audio type before writing any bytes
+    
+    Declared type, extension and the magic bytes of the first chunk are all
+    checked before that chunk reaches disk. The content hash is computed in
+    the same pass, so nothing downstream has to re-read the file to get it.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.detected_types: Optional[set] = None
+        self._hasher = hashlib.blake2b(digest_size=16)
+    
+    @property
+    def content_hash(self) -> str:
+        """Hex digest of every byte written so far"""
+        return self._hasher.hexdigest()
     
-    return True
+    async def on_data_received_async(self, chunk: bytes):
+        if self.detected_types is None:
+            # The part's Content-Type is only known once its body begins
+            if not validate_file_type(self.multipart_content_type, self.multipart_filename):
+                raise UnsupportedAudioError("declared type or extension not allowed")
+            self.detected_types = sniff_audio_types(chunk[:_SNIFF_BYTES])
+            if self.detected_types.isdisjoint(_SNIFFED_AUDIO_MIMES):
+                raise UnsupportedAudioError("content is not a recognised audio format")
+        self._hasher.update(chunk)
+        await super().on_data_received_async(chunk)
+    
+    async def aclose(self):
+        """Close the temp file if the parser stopped before on_finish"""
+        if self._fd:
+            await self._fd.close()
+            self._fd = None
+    
+    async def on_finish_async(self):
+        await self.aclose()
+
+# Every character outside the allow-set is deleted in one C-level pass
+_FILENAME_ALLOWED = frozenset(map(ord, "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-"))
+_FILENAME_TRANS = {c: None for c in range(128) if c not in _FILENAME_ALLOWED}
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename to prevent path traversal attacks"""
     if not filename:
         return "unknown_file"
     
-    # Remove path components
-    filename = os.path.basename(filename)
-    
-    # Remove dangerous characters
-    allowed_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-"
-    sanitized = ''.join(c for c in filename if c in allowed_chars)
+    # Remove path components, non-ASCII and then dangerous characters
+    sanitized = os.path.basename(filename).encode('ascii', 'ignore').decode('ascii').translate(_FILENAME_TRANS)
     
     # Ensure it's not empty and not too long
-    if not sanitized:
-        sanitized = "unknown_file"
-    
-    return sanitized[:255]  # Limit length
+    return sanitized[:255] or "unknown_file"
 
 # Enhanced Pydantic models with validation
 class MemoryRequest(BaseModel):
@@ -200,7 +414,7 @@ class MemoryRequest(BaseModel):
     def validate_metadata(cls, v):
         if v is not None:
             # Limit metadata size when serialized
-            metadata_json = json.dumps(v)
+            metadata_json = orjson.dumps(v)
             if len(metadata_json) > SECURITY_CONFIG['MAX_METADATA_SIZE']:
                 raise ValueError(f'Metadata too large (max {SECURITY_CONFIG["MAX_METADATA_SIZE"]} bytes)')
         return v
@@ -249,6 +463,29 @@ class ErrorResponse(BaseModel):
     error_code: Optional[str] = None
     timestamp: datetime
 
+# Response conversion
+def _memory_to_row(memory: Any) -> Dict[str, Any]:
+    """Flatten a Memory object or processor row into MemoryResponse fields"""
+    if isinstance(memory, Memory):
+        memory_dict = memory.dict()
+        timestamp = memory_dict.get("timestamp")
+        if isinstance(timestamp, datetime):
+            memory_dict["timestamp"] = timestamp.timestamp()
+        return memory_dict
+    return memory
+
+def memory_to_response(memory: Any) -> MemoryResponse:
+    """Wrap trusted processor output without validating it here
+    
+    The route's response_model validates the result once on the way out, so
+    constructing directly avoids a second validation pass per memory.
+    """
+    return MemoryResponse.construct(**_memory_to_row(memory))
+
+def memories_to_responses(memories: List[Any]) -> List[MemoryResponse]:
+    """Convert a result set to MemoryResponse models"""
+    return [memory_to_response(memory) for memory in memories]
+
 # Dependency injection functions
 def get_memory_processor() -> MemoryProcessor:
     """Dependency injection for MemoryProcessor"""
@@ -258,6 +495,25 @@ def get_audio_assistant() -> AudioMemoryAssistant:
     """Dependency injection for AudioMemoryAssistant"""
     return app_state.get_audio_assistant()
 
+# Conditional GET helpers
+def compute_analytics_etag(processor: MemoryProcessor, *extra: Any) -> str:
+    """Build a strong ETag from the processor's memory-set digest"""
+    count, latest_timestamp, version = processor.get_analytics_digest()
+    digest = hashlib.blake2b(
+        struct.pack('>QdQ', count, latest_timestamp, version),
+        digest_size=16
+    )
+    for part in extra:
+        digest.update(str(part).encode())
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match header against an ETag"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
 # Enhanced error handling
 class APIError(Exception):
     """Custom API error with structured information"""
@@ -271,28 +527,29 @@ class APIError(Exception):
 async def api_error_handler(request: Request, exc: APIError):
     """Handle custom API errors"""
     logger.error("API Error: %s (code: %s)", exc.message, exc.error_code)
-    return ErrorResponse(
+    error = ErrorResponse(
         detail=exc.message,
         error_code=exc.error_code,
-        timestamp=datetime.utcnow()
+        timestamp=clock.utcnow()
     )
+    return ORJSONResponse(status_code=exc.status_code, content=jsonable_encoder(error))
 
 @app.exception_handler(ValueError)
 async def value_error_handler(request: Request, exc: ValueError):
     """Handle validation errors"""
     logger.warning("Validation error: %s", str(exc))
-    raise HTTPException(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        detail=str(exc)
+        content={"detail": str(exc)}
     )
 
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
-    """Global exception handler with logging"""
+    """Global exception handler with logging; never echoes exception text"""
     logger.error("Unexpected error: %s", str(exc), exc_info=True)
-    raise HTTPException(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        detail="An unexpected error occurred. Please try again later."
+        content={"detail": "An unexpected error occurred. Please try again later."}
     )
 
 # Root route
@@ -305,39 +562,54 @@ async def root():
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     """Serve favicon or return empty response"""
-    try:
-        favicon_path = os.path.join(os.path.dirname(__file__), "../static/favicon.ico")
-        if os.path.exists(favicon_path):
-            return FileResponse(favicon_path, media_type="image/x-icon")
-    except Exception as e:
-        logger.warning("Could not serve favicon: %s", e)
-    
-    return Response(content=b"", media_type="image/x-icon")
+    return Response(content=FAVICON_BYTES, media_type="image/x-icon")
 
 # Health check endpoint
+_health_cache: Dict[str, Any] = {'at': 0.0, 'response': None}
+_health_lock = asyncio.Lock()
+
+def _check_health() -> HealthResponse:
+    """Probe the services; raises if a component is unavailable"""
+    memory_processor = app_state.get_memory_processor()
+    audio_assistant = app_state.get_audio_assistant()
+    
+    return HealthResponse(
+        status="healthy",
+        version="1.0.0",
+        dependencies={
+            "database": "connected" if memory_processor else "disconnected",
+            "audio_processor": "loaded" if audio_assistant else "not_loaded",
+            "ai_models": "loaded"
+        }
+    )
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Enhanced health check endpoint"""
-    try:
-        # Check if services are available
-        memory_processor = app_state.get_memory_processor()
-        audio_assistant = app_state.get_audio_assistant()
-        
-        return HealthResponse(
-            status="healthy",
-            version="1.0.0",
-            dependencies={
-                "database": "connected" if memory_processor else "disconnected",
-                "audio_processor": "loaded" if audio_assistant else "not_loaded",
-                "ai_models": "loaded"
-            }
-        )
-    except Exception as e:
-        logger.error("Health check failed: %s", e)
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Service unhealthy"
-        )
+    """Enhanced health check endpoint
+    
+    A healthy result is reused for HEALTH_TTL seconds, and concurrent probes
+    share one check, so frequent liveness probes cost one probe per interval.
+    """
+    cached = _health_cache['response']
+    if cached is not None and time.monotonic() - _health_cache['at'] < CACHE_CONFIG['HEALTH_TTL']:
+        return cached
+    
+    async with _health_lock:
+        # Another probe may have refreshed the result while we waited
+        cached = _health_cache['response']
+        if cached is not None and time.monotonic() - _health_cache['at'] < CACHE_CONFIG['HEALTH_TTL']:
+            return cached
+        try:
+            response = await run_in_threadpool(_check_health)
+        except Exception as e:
+            logger.error("Health check failed: %s", e)
+            _health_cache['response'] = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service unhealthy"
+            )
+        _health_cache.update(at=time.monotonic(), response=response)
+        return response
 
 # Memory CRUD operations with enhanced validation
 @app.post("/memories", response_model=MemoryResponse)
@@ -350,16 +622,10 @@ async def create_memory(
         logger.info("Creating text memory with %d characters", len(request.text))
         
         # Process the text memory
-        memory_data = processor.process_text_memory(request.text, request.metadata)
+        memory_data = await processor.aprocess_text_memory(request.text, request.metadata)
         
         # Convert Memory object to response format
-        if isinstance(memory_data, Memory):
-            memory_dict = memory_data.dict()
-            if isinstance(memory_data.timestamp, datetime):
-                memory_dict["timestamp"] = memory_data.timestamp.timestamp()
-            return MemoryResponse(**memory_dict)
-        else:
-            return MemoryResponse(**memory_data)
+        return memory_to_response(memory_data)
             
     except Exception as e:
         logger.error("Failed to create text memory: %s", e)
@@ -369,79 +635,168 @@ async def create_memory(
             error_code="MEMORY_CREATION_FAILED"
         )
 
-@app.post("/memories/audio", response_model=MemoryResponse)
+@app.post(
+    "/memories/audio",
+    response_model=MemoryResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary", "description": "Audio file to process"},
+                            "metadata": {"type": "string", "description": "Optional metadata as JSON"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
 async def upload_audio_memory(
-    file: UploadFile = File(..., description="Audio file to process"),
-    metadata: Optional[str] = Query(None, max_length=SECURITY_CONFIG['MAX_METADATA_SIZE']),
+    request: Request,
+    metadata: Optional[str] = Query(None, max_length=_MAX_METADATA_SIZE),
     audio_assistant: AudioMemoryAssistant = Depends(get_audio_assistant)
 ):
-    """Upload and process an audio file with enhanced security"""
+    """Upload and process an audio file with enhanced security
+    
+    The multipart body is parsed straight off the request stream, so the
+    audio is written to our temp file once instead of being spooled first.
+    """
     temp_file_path = None
     
     try:
-        # File size validation
-        if hasattr(file, 'size') and file.size and file.size > SECURITY_CONFIG['MAX_FILE_SIZE']:
+        if not request.headers.get('content-type', '').startswith('multipart/form-data'):
             raise APIError(
-                message=f"File too large. Maximum size: {SECURITY_CONFIG['MAX_FILE_SIZE']} bytes",
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                error_code="FILE_TOO_LARGE"
+                message="Audio must be uploaded as multipart/form-data",
+                status_code=_HTTP_400,
+                error_code="INVALID_CONTENT_TYPE"
             )
         
-        # File type validation
-        if not validate_file_type(file):
+        # Reject a declared oversize body before reading any of it; chunked
+        # uploads without Content-Length fall through to the in-loop check
+        content_length = request.headers.get('content-length', '')
+        expected_size = int(content_length) if content_length.isdigit() else None
+        if expected_size is not None and expected_size > _MAX_UPLOAD_BODY_SIZE:
             raise APIError(
-                message="Invalid file type. Allowed types: " + ", ".join(SECURITY_CONFIG['ALLOWED_AUDIO_TYPES']),
-                status_code=status.HTTP_400_BAD_REQUEST,
-                error_code="INVALID_FILE_TYPE"
+                message=_FILE_TOO_LARGE_MESSAGE,
+                status_code=_HTTP_413,
+                error_code="FILE_TOO_LARGE"
             )
         
-        # Sanitize filename
-        safe_filename = sanitize_filename(file.filename or "unknown_audio")
-        logger.info("Processing audio file: %s (type: %s)", safe_filename, file.content_type)
-        
-        # Create secure temporary file
-        temp_dir = tempfile.gettempdir()
+        # Create secure temporary file, in RAM when the declared body fits
+        temp_dir = staging_dir_for(expected_size)
         temp_fd, temp_file_path = tempfile.mkstemp(
-            suffix=f"_{safe_filename}",
-            prefix=SECURITY_CONFIG['TEMP_FILE_PREFIX'],
+            prefix=_TEMP_FILE_PREFIX,
             dir=temp_dir
         )
+        os.close(temp_fd)
+        
+        # Size validators run before each chunk is written
+        file_size = MaxSizeValidator(_MAX_FILE_SIZE)
+        file_target = AudioUploadTarget(temp_file_path, validator=file_size)
+        metadata_target = ValueTarget(validator=MaxSizeValidator(_MAX_METADATA_SIZE))
+        
+        parser = StreamingFormDataParser(headers=request.headers)
+        parser.register('file', file_target)
+        parser.register('metadata', metadata_target)
+        
+        # Coalesce the server's small receive chunks so each threadpool write
+        # moves up to UPLOAD_CHUNK_SIZE bytes; costs that much buffer per upload
+        buffer = bytearray()
+        total_size = 0
         
         try:
             # Stream file content to disk with size checking
-            total_size = 0
-            with os.fdopen(temp_fd, 'wb') as temp_file:
-                while chunk := await file.read(SECURITY_CONFIG['UPLOAD_CHUNK_SIZE']):
-                    total_size += len(chunk)
-                    if total_size > SECURITY_CONFIG['MAX_FILE_SIZE']:
-                        raise APIError(
-                            message=f"File too large. Maximum size: {SECURITY_CONFIG['MAX_FILE_SIZE']} bytes",
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            error_code="FILE_TOO_LARGE"
-                        )
-                    temp_file.write(chunk)
+            async for chunk in request.stream():
+                if total_size + len(chunk) > _MAX_UPLOAD_BODY_SIZE:
+                    raise APIError(
+                        message=_FILE_TOO_LARGE_MESSAGE,
+                        status_code=_HTTP_413,
+                        error_code="FILE_TOO_LARGE"
+                    )
+                total_size += len(chunk)
+                buffer += chunk
+                if len(buffer) >= _UPLOAD_CHUNK_SIZE:
+                    await parser.adata_received(bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await parser.adata_received(bytes(buffer))
         except APIError:
+            await file_target.aclose()
             raise
+        except UnsupportedAudioError as e:
+            await file_target.aclose()
+            logger.warning("Rejected audio upload: %s", e)
+            raise APIError(
+                message=_INVALID_FILE_TYPE_MESSAGE,
+                status_code=_HTTP_400,
+                error_code="INVALID_FILE_TYPE"
+            )
+        except ValidationError:
+            await file_target.aclose()
+            if file_size.so_far > _MAX_FILE_SIZE:
+                raise APIError(
+                    message=_FILE_TOO_LARGE_MESSAGE,
+                    status_code=_HTTP_413,
+                    error_code="FILE_TOO_LARGE"
+                )
+            raise APIError(
+                message=f"Metadata too large (max {_MAX_METADATA_SIZE} bytes)",
+                status_code=_HTTP_400,
+                error_code="METADATA_TOO_LARGE"
+            )
         except Exception as e:
+            await file_target.aclose()
             logger.error("Failed to write uploaded file: %s", e)
             raise APIError(
                 message="Failed to process uploaded file",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=_HTTP_500,
                 error_code="FILE_PROCESSING_ERROR"
             )
         
-        # Parse and validate metadata
-        metadata_dict = None
+        if file_target.multipart_filename is None:
+            raise APIError(
+                message="No audio file provided",
+                status_code=_HTTP_400,
+                error_code="MISSING_FILE"
+            )
+        
+        # Type checks ran on the stream; an empty part was never sniffed
+        if not file_target.detected_types:
+            raise APIError(
+                message=_INVALID_FILE_TYPE_MESSAGE,
+                status_code=_HTTP_400,
+                error_code="INVALID_FILE_TYPE"
+            )
+        
+        # Sanitize filename
+        safe_filename = sanitize_filename(file_target.multipart_filename or "unknown_audio")
+        logger.info("Processing audio file: %s (type: %s)", safe_filename, file_target.multipart_content_type)
+        
+        # Keep the original extension on disk for the audio decoder
+        named_path = f"{temp_file_path}_{safe_filename}"
+        await aiofiles.os.replace(temp_file_path, named_path)
+        temp_file_path = named_path
+        
+        # Parse and validate metadata; the form field wins over the query param
+        metadata_dict = {}
+        metadata = metadata_target.value or metadata
         if metadata:
             try:
-                metadata_dict = json.loads(metadata)
-                # Additional metadata validation could be added here
-            except json.JSONDecodeError as e:
+                metadata_dict = orjson.loads(metadata)
+            except orjson.JSONDecodeError:
+                metadata_dict = None
+            if not isinstance(metadata_dict, dict):
                 raise APIError(
                     message="Invalid metadata JSON format",
-                    status_code=status.HTTP_400_BAD_REQUEST,
+                    status_code=_HTTP_400,
                     error_code="INVALID_METADATA_FORMAT"
                 )
+        metadata_dict["content_hash"] = file_target.content_hash
         
         # Process audio file
         try:
@@ -449,22 +804,19 @@ async def upload_audio_memory(
             gcs_url = None
             if storage_client.is_available():
                 audio_filename = f"audio/{datetime.now().strftime('%Y%m%d%H%M%S')}_{safe_filename}"
-                gcs_url = storage_client.upload_file(temp_file_path, audio_filename)
+                gcs_url = await run_in_threadpool(storage_client.upload_file, temp_file_path, audio_filename)
                 logger.info(f"Uploaded audio to GCS: {audio_filename}")
                 
                 # Add GCS URL to metadata if available
-                if gcs_url and (metadata_dict is None):
-                    metadata_dict = {}
                 if gcs_url:
-                    metadata_dict = metadata_dict or {}
                     metadata_dict["audio_url"] = gcs_url
             
-            memory_data = audio_assistant.process_audio_file(temp_file_path, metadata_dict)
+            memory_data = await run_in_threadpool(audio_assistant.process_audio_file, temp_file_path, metadata_dict)
             
             if not memory_data:
                 raise APIError(
                     message="No speech detected in audio file",
-                    status_code=status.HTTP_400_BAD_REQUEST,
+                    status_code=_HTTP_400,
                     error_code="NO_SPEECH_DETECTED"
                 )
             
@@ -475,13 +827,7 @@ async def upload_audio_memory(
                 memory_data["source_url"] = gcs_url
             
             # Convert Memory object to response format
-            if isinstance(memory_data, Memory):
-                memory_dict = memory_data.dict()
-                if isinstance(memory_data.timestamp, datetime):
-                    memory_dict["timestamp"] = memory_data.timestamp.timestamp()
-                return MemoryResponse(**memory_dict)
-            else:
-                return MemoryResponse(**memory_data)
+            return memory_to_response(memory_data)
                 
         except APIError:
             raise
@@ -489,7 +835,7 @@ async def upload_audio_memory(
             logger.error("Audio processing failed: %s", e)
             raise APIError(
                 message=f"Audio processing failed: {str(e)}",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=_HTTP_500,
                 error_code="AUDIO_PROCESSING_FAILED"
             )
         
@@ -499,15 +845,17 @@ async def upload_audio_memory(
         logger.error("Unexpected error in audio upload: %s", e)
         raise APIError(
             message="An unexpected error occurred during file upload",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=_HTTP_500,
             error_code="UPLOAD_ERROR"
         )
     finally:
         # Guaranteed cleanup of temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
+        if temp_file_path:
             try:
-                os.unlink(temp_file_path)
+                await aiofiles.os.remove(temp_file_path)
                 logger.debug("Cleaned up temporary file: %s", temp_file_path)
+            except FileNotFoundError:
+                pass
             except OSError as e:
                 logger.error("Failed to cleanup temporary file %s: %s", temp_file_path, e)
 
@@ -526,7 +874,7 @@ async def get_memory(
                 error_code="INVALID_MEMORY_ID"
             )
         
-        memory = processor.get_memory(memory_id.strip())
+        memory = await run_in_threadpool(processor.get_memory, memory_id.strip())
         if not memory:
             raise APIError(
                 message="Memory not found",
@@ -535,13 +883,7 @@ async def get_memory(
             )
         
         # Convert Memory object to response format
-        if isinstance(memory, Memory):
-            memory_dict = memory.dict()
-            if isinstance(memory.timestamp, datetime):
-                memory_dict["timestamp"] = memory.timestamp.timestamp()
-            return MemoryResponse(**memory_dict)
-        else:
-            return MemoryResponse(**memory)
+        return memory_to_response(memory)
             
     except APIError:
         raise
@@ -561,20 +903,10 @@ async def list_memories(
 ):
     """List memories with pagination and validation"""
     try:
-        memories = processor.list_memories(skip=skip, limit=limit)
+        memories = await run_in_threadpool(processor.list_memories, skip=skip, limit=limit)
         
         # Convert Memory objects to response format
-        result = []
-        for memory in memories:
-            if isinstance(memory, Memory):
-                memory_dict = memory.dict()
-                if isinstance(memory.timestamp, datetime):
-                    memory_dict["timestamp"] = memory.timestamp.timestamp()
-                result.append(MemoryResponse(**memory_dict))
-            else:
-                result.append(MemoryResponse(**memory))
-        
-        return result
+        return memories_to_responses(memories)
         
     except Exception as e:
         logger.error("Failed to list memories: %s", e)
@@ -600,7 +932,8 @@ async def search_memories(
                     error_code="INVALID_DATE_RANGE"
                 )
         
-        memories = processor.search_memories(
+        memories = await run_in_threadpool(
+            processor.search_memories,
             query=search_req.query,
             emotion=search_req.emotion,
             tags=search_req.tags,
@@ -609,17 +942,7 @@ async def search_memories(
         )
         
         # Convert Memory objects to response format
-        result = []
-        for memory in memories:
-            if isinstance(memory, Memory):
-                memory_dict = memory.dict()
-                if isinstance(memory.timestamp, datetime):
-                    memory_dict["timestamp"] = memory.timestamp.timestamp()
-                result.append(MemoryResponse(**memory_dict))
-            else:
-                result.append(MemoryResponse(**memory))
-        
-        return result
+        return memories_to_responses(memories)
         
     except APIError:
         raise
@@ -646,7 +969,7 @@ async def delete_memory(
                 error_code="INVALID_MEMORY_ID"
             )
         
-        success = processor.delete_memory(memory_id.strip())
+        success = await run_in_threadpool(processor.delete_memory, memory_id.strip())
         if not success:
             raise APIError(
                 message="Memory not found",
@@ -681,7 +1004,7 @@ async def update_memory(
                 error_code="INVALID_MEMORY_ID"
             )
         
-        memory = processor.update_memory(memory_id.strip(), request.text, request.metadata)
+        memory = await run_in_threadpool(processor.update_memory, memory_id.strip(), request.text, request.metadata)
         if not memory:
             raise APIError(
                 message="Memory not found",
@@ -690,13 +1013,7 @@ async def update_memory(
             )
         
         # Convert Memory object to response format
-        if isinstance(memory, Memory):
-            memory_dict = memory.dict()
-            if isinstance(memory.timestamp, datetime):
-                memory_dict["timestamp"] = memory.timestamp.timestamp()
-            return MemoryResponse(**memory_dict)
-        else:
-            return MemoryResponse(**memory)
+        return memory_to_response(memory)
             
     except APIError:
         raise
@@ -710,11 +1027,24 @@ async def update_memory(
 
 # Analytics endpoints with enhanced error handling
 @app.get("/analytics", response_model=AnalyticsResponse)
-async def get_analytics(processor: MemoryProcessor = Depends(get_memory_processor)):
+async def get_analytics(
+    request: Request,
+    response: Response,
+    processor: MemoryProcessor = Depends(get_memory_processor)
+):
     """Get memory analytics and statistics"""
     try:
-        analytics = processor.get_analytics()
-        return AnalyticsResponse(**analytics)
+        etag = await run_in_threadpool(compute_analytics_etag, processor, "analytics")
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        analytics = analytics_cache.get(etag)
+        if analytics is None:
+            analytics = AnalyticsResponse(**await run_in_threadpool(processor.get_analytics))
+            analytics_cache[etag] = analytics
+        
+        response.headers["ETag"] = etag
+        return analytics
     except Exception as e:
         logger.error("Failed to get analytics: %s", e)
         raise APIError(
@@ -725,13 +1055,25 @@ async def get_analytics(processor: MemoryProcessor = Depends(get_memory_processo
 
 @app.get("/analytics/emotions")
 async def get_emotion_trends(
+    request: Request,
+    response: Response,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
     processor: MemoryProcessor = Depends(get_memory_processor)
 ):
     """Get emotion trends over time"""
     try:
-        trends = processor.get_emotion_trends(days)
-        return {"trends": trends, "period_days": days}
+        # The trend window slides daily, so the date is part of the validator
+        etag = await run_in_threadpool(compute_analytics_etag, processor, "emotions", days, date.today())
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        result = analytics_cache.get(etag)
+        if result is None:
+            result = {"trends": await run_in_threadpool(processor.get_emotion_trends, days), "period_days": days}
+            analytics_cache[etag] = result
+        
+        response.headers["ETag"] = etag
+        return result
     except Exception as e:
         logger.error("Failed to get emotion trends: %s", e)
         raise APIError(
@@ -743,36 +1085,41 @@ async def get_emotion_trends(
 # Export endpoints with security considerations
 @app.get("/export/json")
 async def export_memories_json(processor: MemoryProcessor = Depends(get_memory_processor)):
-    """Export all memories as JSON"""
-    try:
-        export_data = processor.export_memories("json")
-        return {"data": export_data, "format": "json", "exported_at": datetime.utcnow().isoformat()}
-    except Exception as e:
-        logger.error("JSON export failed: %s", e)
-        raise APIError(
-            message="Export operation failed",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            error_code="EXPORT_FAILED"
-        )
+    """Export all memories as JSON, streamed one database batch at a time"""
+    async def generate():
+        yield b'{"data":['
+        try:
+            async for chunk in iterate_in_threadpool(processor.iter_export_json()):
+                yield chunk
+        except Exception as e:
+            logger.error("JSON export failed: %s", e)
+            raise
+        yield b'],"format":"json","exported_at":' + orjson.dumps(clock.isoformat()) + b'}'
+    
+    return StreamingResponse(generate(), media_type="application/json")
 
 @app.get("/export/csv")
 async def export_memories_csv(processor: MemoryProcessor = Depends(get_memory_processor)):
-    """Export all memories as CSV"""
-    try:
-        csv_data = processor.export_memories("csv")
-        return {"data": csv_data, "format": "csv", "exported_at": datetime.utcnow().isoformat()}
-    except Exception as e:
-        logger.error("CSV export failed: %s", e)
-        raise APIError(
-            message="Export operation failed",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            error_code="EXPORT_FAILED"
-        )
+    """Export all memories as a CSV download, streamed one database batch at a time"""
+    async def generate():
+        try:
+            async for chunk in iterate_in_threadpool(processor.iter_export_csv()):
+                yield chunk
+        except Exception as e:
+            logger.error("CSV export failed: %s", e)
+            raise
+    
+    filename = f"memories_{clock.utcnow().strftime('%Y%m%d%H%M%S')}.csv"
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 # Bulk operations with validation
 @app.post("/memories/bulk-delete")
 async def bulk_delete_memories(
-    memory_ids: List[str] = Field(..., min_items=1, max_items=100),
+    memory_ids: List[str] = Body(..., min_items=1, max_items=100),
     processor: MemoryProcessor = Depends(get_memory_processor)
 ):
     """Delete multiple memories with validation"""
@@ -794,12 +1141,12 @@ async def bulk_delete_memories(
                 error_code="INVALID_MEMORY_IDS"
             )
         
-        deleted_count = processor.bulk_delete_memories(clean_ids)
-        return {
+        deleted_count = await processor.abulk_delete_memories(clean_ids)
+        return ORJSONResponse({
             "message": f"Deleted {deleted_count} out of {len(clean_ids)} memories",
             "deleted_count": deleted_count,
             "requested_count": len(clean_ids)
-        }
+        })
     except APIError:
         raise
     except Exception as e:
@@ -819,20 +1166,10 @@ async def find_similar_memories(
 ):
     """Find memories similar to given text"""
     try:
-        similar_memories = processor.find_similar_memories(request.text, limit)
+        similar_memories = await run_in_threadpool(processor.find_similar_memories, request.text, limit)
         
         # Convert Memory objects to response format
-        result = []
-        for memory in similar_memories:
-            if isinstance(memory, Memory):
-                memory_dict = memory.dict()
-                if isinstance(memory.timestamp, datetime):
-                    memory_dict["timestamp"] = memory.timestamp.timestamp()
-                result.append(MemoryResponse(**memory_dict))
-            else:
-                result.append(MemoryResponse(**memory))
-        
-        return result
+        return memories_to_responses(similar_memories)
         
     except Exception as e:
         logger.error("Similarity search failed: %s", e)
@@ -854,8 +1191,12 @@ if __name__ == "__main__":
         "log_level": "info",
     }
     
-    # Add SSL in production if certificates are available
     if os.getenv("ENVIRONMENT") == "production":
+        # Pin the libuv loop and C HTTP parser from uvicorn[standard];
+        # development keeps uvicorn's "auto" choice so it runs without them
+        uvicorn_config.update({"loop": "uvloop", "http": "httptools"})
+        
+        # Add SSL in production if certificates are available
         ssl_keyfile = os.getenv("SSL_KEYFILE")
         ssl_certfile = os.getenv("SSL_CERTFILE")
         if ssl_keyfile and ssl_certfile:
@@ -1,10 +1,23 @@
 # Advanced Memory Insights Engine with Configuration Constants
+import heapq
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from collections import Counter
+from itertools import chain, islice
 from dataclasses import dataclass
-import statistics
+import numpy as np
+import orjson
+from cachetools import TTLCache
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below are plain NumPy without it
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,9 +38,56 @@ INSIGHTS_CONFIG = {
     'MIN_SAMPLE_SIZE': 5,                    # minimum sample size for statistics
     'OUTLIER_DETECTION_THRESHOLD': 2.0,      # standard deviations for outlier detection
     'CORRELATION_THRESHOLD': 0.3,            # minimum correlation for relationships
-    'FREQUENCY_THRESHOLD': 0.1               # minimum frequency for pattern recognition
+    'FREQUENCY_THRESHOLD': 0.1,              # minimum frequency for pattern recognition
+    'INSIGHT_CACHE_SIZE': 32,                # memory sets whose insights are kept
+    'INSIGHT_CACHE_TTL': 60,                 # seconds before cached insights are recomputed
+    'FRAME_CHUNK_SIZE': 50000                # memories converted to columns per batch
 }
 
+# Timestamps are stored as wall-clock microseconds since 1970; NaT marks a missing one
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_TIMESTAMP = (np.iinfo(np.int64).min, False)
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+@njit(cache=True)
+def _trend_slope(values):
+    """Least squares slope of values against 0..n-1"""
+    n = values.size
+    if n < 2:
+        return 0.0
+    # x is always 0..n-1, so the sums over x have closed forms:
+    # slope = 12*sum(i*y) / (n*(n^2-1)) - 6*sum(y) / (n*(n+1))
+    weighted_sum = (np.arange(n) * values).sum()
+    return 12.0 * weighted_sum / (n * (n * n - 1)) - 6.0 * values.sum() / (n * (n + 1))
+
+@njit(cache=True)
+def _sample_std(values, mean):
+    """Sample standard deviation, matching statistics.stdev"""
+    n = values.size
+    if n < 2:
+        return 0.0
+    return np.sqrt(((values - mean) ** 2).sum() / (n - 1))
+
+@njit(cache=True)
+def _importance_kernel(scores, high_threshold, medium_threshold, trend_window):
+    """Return (mean, high_ratio, low_ratio, trend_slope, std) for importance scores"""
+    n = scores.size
+    mean = scores.mean()
+    high_ratio = (scores >= high_threshold).sum() / n
+    low_ratio = (scores < medium_threshold).sum() / n
+    trend_slope = 0.0
+    if n >= trend_window:
+        trend_slope = _trend_slope(scores[n - trend_window:])
+    return mean, high_ratio, low_ratio, trend_slope, _sample_std(scores, mean)
+
+@njit(cache=True)
+def _content_kernel(lengths, word_counts):
+    """Return (avg_length, avg_words, length_std) for content lengths"""
+    avg_length = lengths.mean()
+    return avg_length, word_counts.mean(), _sample_std(lengths, avg_length)
+
 @dataclass
 class Insight:
     """Structured insight with confidence scoring"""
@@ -41,78 +101,274 @@ class Insight:
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
+@dataclass
+class MemoryFrame:
+    """Column-oriented view of a memory list, built once per analysis run
+    
+    timestamps, naive and emotion_codes have one entry per memory; the score and
+    content columns only hold the memories that carry a usable value. word_counts
+    is None unless the frame was built with word counting enabled.
+    """
+    count: int
+    now: np.datetime64           # local time the frame was built; reference for cutoffs and ages
+    timestamps: np.ndarray       # datetime64[us] wall-clock time, NaT when missing or invalid
+    naive: np.ndarray            # True where the timestamp is naive (comparable with local now)
+    emotion_codes: np.ndarray    # index into emotion_labels
+    emotion_labels: List[Any]    # distinct emotions in order of first appearance
+    importance: np.ndarray       # numeric importance scores (float64)
+    lengths: np.ndarray          # content length in characters (int64)
+    word_counts: Optional[np.ndarray]  # content length in words (int64)
+    topics: Counter
+    tags: Counter
+    
+    def emotion_counts(self) -> np.ndarray:
+        """Number of memories per emotion label"""
+        return np.bincount(self.emotion_codes, minlength=len(self.emotion_labels))
+    
+    def dated(self) -> np.ndarray:
+        """Mask of memories whose timestamp can be compared with the local clock"""
+        return self.naive & ~np.isnat(self.timestamps)
+
 class InsightEngine:
     """Advanced analytics engine for generating insights from memory patterns"""
     
     def __init__(self, memory_processor):
         self.memory_processor = memory_processor
         self.config = INSIGHTS_CONFIG
+        # Dashboards poll with the same memory set; the TTL bounds how stale
+        # time-relative insights (recent emotions) can get
+        self._insight_cache = TTLCache(
+            maxsize=self.config['INSIGHT_CACHE_SIZE'],
+            ttl=self.config['INSIGHT_CACHE_TTL']
+        )
+        self._insight_cache_lock = threading.Lock()
         logger.info("Insight engine initialized with configuration")
     
-    def generate_insights(self, memories: List[Dict[str, Any]]) -> List[Insight]:
-        """Generate comprehensive insights from memory data"""
-        if not memories or len(memories) < self.config['MIN_SAMPLE_SIZE']:
+    def generate_insights(self, memories: Iterable[Dict[str, Any]]) -> List[Insight]:
+        """Generate comprehensive insights from memory data
+        
+        memories may be a list or any iterable (e.g. a generator over database
+        batches); iterables are converted to columns chunk by chunk without ever
+        being held in memory as a whole.
+        """
+        is_sequence = isinstance(memories, Sequence)
+        if is_sequence and len(memories) < self.config['MIN_SAMPLE_SIZE']:
             logger.warning("Insufficient memory data for insight generation")
             return []
         
+        cache_key = self._insight_cache_key(memories) if is_sequence else None
+        if cache_key is not None:
+            with self._insight_cache_lock:
+                cached = self._insight_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        
         insights = []
         
         try:
+            # Walk the memories once; the analyzers only read the resulting columns
+            frame = self._build_frame(memories, word_counts=True)
+            if frame.count < self.config['MIN_SAMPLE_SIZE']:
+                logger.warning("Insufficient memory data for insight generation")
+                return []
+            
             # Generate different types of insights with error handling
-            insights.extend(self._analyze_activity_patterns(memories))
-            insights.extend(self._analyze_emotion_trends(memories))
-            insights.extend(self._analyze_importance_distribution(memories))
-            insights.extend(self._analyze_topic_clustering(memories))
-            insights.extend(self._analyze_temporal_patterns(memories))
-            insights.extend(self._analyze_content_patterns(memories))
-            
-            # Filter by confidence threshold and limit results
-            high_confidence_insights = [
-                insight for insight in insights 
-                if insight.confidence >= self.config['INSIGHT_CONFIDENCE_THRESHOLD']
-            ]
-            
-            # Group by type and limit each category
-            insights_by_type = defaultdict(list)
-            for insight in high_confidence_insights:
-                insights_by_type[insight.type].append(insight)
+            insights.extend(self._analyze_activity_patterns(frame))
+            insights.extend(self._analyze_emotion_trends(frame))
+            insights.extend(self._analyze_importance_distribution(frame))
+            insights.extend(self._analyze_topic_clustering(frame))
+            insights.extend(self._analyze_temporal_patterns(frame))
+            insights.extend(self._analyze_content_patterns(frame))
+            
+            # Keep the N most confident insights per type above the threshold in bounded
+            # min-heaps; -order makes earlier insights win ties, as a stable sort would
+            max_per_type = self.config['MAX_INSIGHTS_PER_CATEGORY']
+            heaps_by_type = {}
+            for order, insight in enumerate(insights):
+                if insight.confidence < self.config['INSIGHT_CONFIDENCE_THRESHOLD']:
+                    continue
+                heap = heaps_by_type.setdefault(insight.type, [])
+                entry = (insight.confidence, -order, insight)
+                if len(heap) < max_per_type:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
             
             final_insights = []
-            for insight_type, type_insights in insights_by_type.items():
-                # Sort by confidence and take top N
-                sorted_insights = sorted(type_insights, key=lambda x: x.confidence, reverse=True)
-                final_insights.extend(sorted_insights[:self.config['MAX_INSIGHTS_PER_CATEGORY']])
+            for heap in heaps_by_type.values():
+                final_insights.extend(entry[2] for entry in sorted(heap, reverse=True))
             
-            logger.info("Generated %d insights from %d memories", len(final_insights), len(memories))
-            return final_insights
+            logger.info("Generated %d insights from %d memories", len(final_insights), frame.count)
+            if cache_key is not None:
+                with self._insight_cache_lock:
+                    self._insight_cache[cache_key] = final_insights
+            return list(final_insights)
             
         except Exception as e:
             logger.error("Error generating insights: %s", e)
             return []
     
-    def _analyze_activity_patterns(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    @classmethod
+    def _parse_wall_clock(cls, timestamp: Any) -> Tuple[int, bool]:
+        """Parse a timestamp into (wall-clock microseconds since 1970, is naive)"""
+        dt = cls._parse_timestamp(timestamp)
+        if dt is None:
+            return _NO_TIMESTAMP
+        return (dt.replace(tzinfo=None) - _EPOCH) // _MICROSECOND, dt.tzinfo is None
+    
+    @staticmethod
+    def _insight_cache_key(memories: List[Dict[str, Any]]) -> Optional[tuple]:
+        """Cheap fingerprint of a memory list: its size plus the ids and timestamps at both ends"""
+        try:
+            first, last = memories[0], memories[-1]
+            key = (
+                len(memories),
+                first.get('id'), first.get('timestamp'),
+                last.get('id'), last.get('timestamp')
+            )
+            hash(key)
+            return key
+        except (AttributeError, TypeError):
+            return None
+    
+    @staticmethod
+    def _parse_timestamp(timestamp: Any) -> Optional[datetime]:
+        """Parse an epoch or ISO-8601 timestamp, returning None if it is unusable"""
+        try:
+            if isinstance(timestamp, (int, float)):
+                return datetime.fromtimestamp(timestamp)
+            if isinstance(timestamp, str):
+                return datetime.fromisoformat(timestamp)
+        except (ValueError, TypeError, OverflowError, OSError):
+            pass
+        return None
+    
+    def _build_frame(self, memories: Iterable[Dict[str, Any]], word_counts: bool = False) -> MemoryFrame:
+        """Convert the memory dicts into columns in one traversal
+        
+        Memories are consumed in FRAME_CHUNK_SIZE batches; each batch's Python
+        lists are packed into NumPy arrays before the next one is read, so only
+        one batch of per-memory Python objects is alive at a time.
+        """
+        # Memories created in bulk often share timestamp and tag strings, so each
+        # distinct value is parsed only once per run
+        parsed_cache: Dict[Any, Tuple[int, bool]] = {}
+        tag_cache: Dict[str, Any] = {}
+        emotion_index: Dict[Any, int] = {}
+        raw_topics = Counter()
+        raw_tags = Counter()
+        columns: Dict[str, List[np.ndarray]] = {
+            'wall_clock': [], 'naive': [], 'emotion_codes': [],
+            'importance': [], 'lengths': [], 'word_counts': []
+        }
+        count = 0
+        
+        emotion_code = emotion_index.setdefault
+        parse_timestamp = self._parse_wall_clock
+        decode_tags = self._decode_tags
+        iterator = iter(memories)
+        
+        while True:
+            chunk = list(islice(iterator, self.config['FRAME_CHUNK_SIZE']))
+            if not chunk:
+                break
+            count += len(chunk)
+            
+            wall_clock = []
+            naive = []
+            emotion_codes = []
+            importance = []
+            contents = []
+            topic_lists = []
+            tag_lists = []
+            
+            # This loop touches every memory, so bound methods are looked up once
+            add_wall_clock = wall_clock.append
+            add_naive = naive.append
+            add_emotion = emotion_codes.append
+            add_importance = importance.append
+            add_content = contents.append
+            add_topics = topic_lists.append
+            add_tags = tag_lists.append
+            
+            for memory in chunk:
+                get = memory.get
+                
+                add_emotion(emotion_code(get('emotion', 'neutral'), len(emotion_index)))
+                
+                # Only epoch numbers and ISO strings can parse; everything else is missing
+                timestamp = get('timestamp')
+                if isinstance(timestamp, (str, int, float)):
+                    parsed = parsed_cache.get(timestamp)
+                    if parsed is None:
+                        parsed = parsed_cache[timestamp] = parse_timestamp(timestamp)
+                else:
+                    parsed = _NO_TIMESTAMP
+                add_wall_clock(parsed[0])
+                add_naive(parsed[1])
+                
+                score = get('importance_score') or get('importance', 0)
+                if isinstance(score, (int, float)):
+                    add_importance(score)
+                
+                content = get('text') or get('content', '')
+                if isinstance(content, str):
+                    add_content(content)
+                
+                topics = get('topics', [])
+                add_topics(topics if isinstance(topics, list) else ())
+                
+                tags = get('tags', [])
+                if isinstance(tags, str):
+                    decoded = tag_cache.get(tags)
+                    if decoded is None:
+                        decoded = tag_cache[tags] = decode_tags(tags)
+                    tags = decoded
+                add_tags(tags if isinstance(tags, list) else ())
+            
+            del chunk
+            columns['wall_clock'].append(np.array(wall_clock, dtype=np.int64))
+            columns['naive'].append(np.array(naive, dtype=bool))
+            columns['emotion_codes'].append(np.array(emotion_codes, dtype=np.int64))
+            columns['importance'].append(np.array(importance, dtype=np.float64))
+            columns['lengths'].append(np.fromiter(map(len, contents), dtype=np.int64, count=len(contents)))
+            if word_counts:
+                columns['word_counts'].append(
+                    np.fromiter(map(len, map(str.split, contents)), dtype=np.int64, count=len(contents))
+                )
+            raw_topics.update(label for label in chain.from_iterable(topic_lists) if isinstance(label, str))
+            raw_tags.update(label for label in chain.from_iterable(tag_lists) if isinstance(label, str))
+        
+        def column(name, dtype):
+            return np.concatenate(columns[name]) if columns[name] else np.empty(0, dtype=dtype)
+        
+        return MemoryFrame(
+            count=count,
+            now=np.datetime64(datetime.now(), 'us'),
+            timestamps=column('wall_clock', np.int64).view('datetime64[us]'),
+            naive=column('naive', bool),
+            emotion_codes=column('emotion_codes', np.int64),
+            emotion_labels=list(emotion_index),
+            importance=column('importance', np.float64),
+            lengths=column('lengths', np.int64),
+            word_counts=column('word_counts', np.int64) if word_counts else None,
+            topics=self._normalize_label_counts(raw_topics),
+            tags=self._normalize_label_counts(raw_tags)
+        )
+    
+    def _analyze_activity_patterns(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze memory creation patterns and activity levels"""
         insights = []
         
         try:
-            # Calculate daily activity
-            daily_counts = defaultdict(int)
-            for memory in memories:
-                try:
-                    if isinstance(memory.get('timestamp'), (int, float)):
-                        date = datetime.fromtimestamp(memory['timestamp']).date()
-                    elif isinstance(memory.get('timestamp'), str):
-                        date = datetime.fromisoformat(memory['timestamp']).date()
-                    else:
-                        continue
-                    daily_counts[date] += 1
-                except (ValueError, TypeError, KeyError):
-                    continue
+            # Daily activity, in chronological order
+            timestamps = frame.timestamps[~np.isnat(frame.timestamps)]
+            _, daily_counts = np.unique(timestamps.astype('datetime64[D]'), return_counts=True)
             
-            if not daily_counts:
+            if not daily_counts.size:
                 return insights
             
-            avg_daily_activity = statistics.mean(daily_counts.values())
+            avg_daily_activity = float(daily_counts.mean())
             
             # High activity detection
             if avg_daily_activity > self.config['HIGH_ACTIVITY_THRESHOLD']:
@@ -133,7 +389,7 @@ class InsightEngine:
                 ))
             
             # Activity trend analysis
-            recent_days = list(daily_counts.values())[-self.config['TREND_ANALYSIS_DAYS']:]
+            recent_days = daily_counts[-self.config['TREND_ANALYSIS_DAYS']:]
             if len(recent_days) >= 3:
                 trend_slope = self._calculate_trend(recent_days)
                 if trend_slope > 0.2:
@@ -156,42 +412,20 @@ class InsightEngine:
         
         return insights
     
-    def _analyze_emotion_trends(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    def _analyze_emotion_trends(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze emotional patterns and trends in memories"""
         insights = []
         
         try:
-            emotion_counts = Counter()
-            recent_emotions = []
-            
-            cutoff_date = datetime.now() - timedelta(days=self.config['TREND_ANALYSIS_DAYS'])
-            
-            for memory in memories:
-                emotion = memory.get('emotion', 'neutral')
-                emotion_counts[emotion] += 1
-                
-                # Track recent emotions for trend analysis
-                try:
-                    if isinstance(memory.get('timestamp'), (int, float)):
-                        mem_date = datetime.fromtimestamp(memory['timestamp'])
-                    elif isinstance(memory.get('timestamp'), str):
-                        mem_date = datetime.fromisoformat(memory['timestamp'])
-                    else:
-                        continue
-                        
-                    if mem_date >= cutoff_date:
-                        recent_emotions.append(emotion)
-                except (ValueError, TypeError, KeyError):
-                    continue
-            
-            if not emotion_counts:
+            if not frame.emotion_labels:
                 return insights
             
-            total_memories = sum(emotion_counts.values())
+            emotion_counts = frame.emotion_counts()
             
-            # Dominant emotion detection
-            most_common_emotion, count = emotion_counts.most_common(1)[0]
-            emotion_percentage = count / total_memories
+            # Dominant emotion detection (argmax keeps the first label on ties)
+            top = int(emotion_counts.argmax())
+            most_common_emotion = frame.emotion_labels[top]
+            emotion_percentage = int(emotion_counts[top]) / frame.count
             
             if emotion_percentage > self.config['FREQUENCY_THRESHOLD'] * 5:  # 50% threshold
                 confidence = min(0.9, emotion_percentage * 1.5)
@@ -202,12 +436,16 @@ class InsightEngine:
                     data={"emotion": most_common_emotion, "percentage": emotion_percentage}
                 ))
             
-            # Recent emotion trend
-            if recent_emotions:
-                recent_emotion_counts = Counter(recent_emotions)
-                if len(recent_emotion_counts) > 0:
-                    recent_dominant = recent_emotion_counts.most_common(1)[0][0]
-                    if recent_dominant != most_common_emotion:
+            # Recent emotion trend; with a single emotion there is nothing to shift toward
+            if len(frame.emotion_labels) > 1:
+                cutoff_date = frame.now - np.timedelta64(self.config['TREND_ANALYSIS_DAYS'], 'D')
+                # NaT never compares >= a date, so missing timestamps drop out here
+                recent = frame.naive & (frame.timestamps >= cutoff_date)
+                recent_emotion_counts = np.bincount(frame.emotion_codes[recent], minlength=len(frame.emotion_labels))
+                if recent_emotion_counts.any():
+                    recent_top = int(recent_emotion_counts.argmax())
+                    if recent_top != top:
+                        recent_dominant = frame.emotion_labels[recent_top]
                         insights.append(Insight(
                             type="emotion_trend",
                             message=f"Recent emotional shift detected: trending toward {recent_dominant}",
@@ -216,13 +454,14 @@ class InsightEngine:
                         ))
             
             # Emotional diversity
-            emotion_diversity = len(emotion_counts) / max(1, len(memories))
+            unique_emotions = len(frame.emotion_labels)
+            emotion_diversity = unique_emotions / max(1, frame.count)
             if emotion_diversity > 0.3:
                 insights.append(Insight(
                     type="emotion_pattern",
-                    message=f"High emotional diversity detected across {len(emotion_counts)} different emotions",
+                    message=f"High emotional diversity detected across {unique_emotions} different emotions",
                     confidence=min(0.9, emotion_diversity * 2),
-                    data={"diversity_score": emotion_diversity, "unique_emotions": len(emotion_counts)}
+                    data={"diversity_score": emotion_diversity, "unique_emotions": unique_emotions}
                 ))
             
         except Exception as e:
@@ -230,27 +469,28 @@ class InsightEngine:
         
         return insights
     
-    def _analyze_importance_distribution(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    def _analyze_importance_distribution(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze the distribution of memory importance scores"""
         insights = []
         
         try:
-            importance_scores = []
-            for memory in memories:
-                score = memory.get('importance_score') or memory.get('importance', 0)
-                if isinstance(score, (int, float)) and 0 <= score <= 1:
-                    importance_scores.append(score)
+            # Only scores inside the valid 0..1 range take part in the distribution
+            importance_scores = frame.importance[(frame.importance >= 0) & (frame.importance <= 1)]
             
-            if len(importance_scores) < self.config['MIN_SAMPLE_SIZE']:
+            if importance_scores.size < self.config['MIN_SAMPLE_SIZE']:
                 return insights
             
-            avg_importance = statistics.mean(importance_scores)
+            _, high_importance_ratio, low_importance_ratio, trend_slope, _ = _importance_kernel(
+                importance_scores,
+                self.config['HIGH_IMPORTANCE_THRESHOLD'],
+                self.config['MEDIUM_IMPORTANCE_THRESHOLD'],
+                self.config['TREND_ANALYSIS_DAYS']
+            )
+            high_importance_ratio = float(high_importance_ratio)
+            low_importance_ratio = float(low_importance_ratio)
+            trend_slope = float(trend_slope)
             
             # High importance trend
-            high_importance_count = sum(1 for score in importance_scores 
-                                      if score >= self.config['HIGH_IMPORTANCE_THRESHOLD'])
-            high_importance_ratio = high_importance_count / len(importance_scores)
-            
             if high_importance_ratio > 0.3:
                 insights.append(Insight(
                     type="importance_pattern",
@@ -260,10 +500,6 @@ class InsightEngine:
                 ))
             
             # Low importance warning
-            low_importance_count = sum(1 for score in importance_scores 
-                                     if score < self.config['MEDIUM_IMPORTANCE_THRESHOLD'])
-            low_importance_ratio = low_importance_count / len(importance_scores)
-            
             if low_importance_ratio > 0.7:
                 insights.append(Insight(
                     type="importance_pattern",
@@ -273,10 +509,7 @@ class InsightEngine:
                 ))
             
             # Importance trend analysis
-            if len(importance_scores) >= self.config['TREND_ANALYSIS_DAYS']:
-                recent_scores = importance_scores[-self.config['TREND_ANALYSIS_DAYS']:]
-                trend_slope = self._calculate_trend(recent_scores)
-                
+            if importance_scores.size >= self.config['TREND_ANALYSIS_DAYS']:
                 if abs(trend_slope) > 0.05:  # Significant trend
                     direction = "increasing" if trend_slope > 0 else "decreasing"
                     insights.append(Insight(
@@ -291,44 +524,21 @@ class InsightEngine:
         
         return insights
     
-    def _analyze_topic_clustering(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    def _analyze_topic_clustering(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze topic patterns and clustering in memories"""
         insights = []
         
         try:
-            topic_counts = defaultdict(int)
-            tag_counts = defaultdict(int)
-            
-            for memory in memories:
-                # Analyze topics
-                topics = memory.get('topics', [])
-                if isinstance(topics, list):
-                    for topic in topics:
-                        if isinstance(topic, str) and topic.strip():
-                            topic_counts[topic.strip().lower()] += 1
-                
-                # Analyze tags
-                tags = memory.get('tags', [])
-                if isinstance(tags, str):
-                    try:
-                        import json
-                        tags = json.loads(tags)
-                    except json.JSONDecodeError:
-                        tags = [tags]
-                
-                if isinstance(tags, list):
-                    for tag in tags:
-                        if isinstance(tag, str) and tag.strip():
-                            tag_counts[tag.strip().lower()] += 1
+            topic_counts = frame.topics
+            tag_counts = frame.tags
             
             # Topic clustering insights
             if topic_counts:
-                dominant_topics = [topic for topic, count in topic_counts.items() 
-                                 if count >= self.config['TOPIC_CLUSTERING_MIN_SIZE']]
+                top_topic, count = topic_counts.most_common(1)[0]
                 
-                if dominant_topics:
-                    top_topic, count = max(topic_counts.items(), key=lambda x: x[1])
-                    topic_ratio = count / len(memories)
+                # The top topic only counts as a cluster once it reaches the minimum size
+                if count >= self.config['TOPIC_CLUSTERING_MIN_SIZE']:
+                    topic_ratio = count / frame.count
                     
                     if topic_ratio > 0.2:
                         insights.append(Insight(
@@ -340,10 +550,10 @@ class InsightEngine:
             
             # Tag pattern insights
             if tag_counts:
-                top_tags = Counter(tag_counts).most_common(3)
+                top_tags = tag_counts.most_common(3)
                 if top_tags:
                     most_used_tag, tag_count = top_tags[0]
-                    tag_ratio = tag_count / len(memories)
+                    tag_ratio = tag_count / frame.count
                     
                     if tag_ratio > 0.25:
                         insights.append(Insight(
@@ -358,34 +568,49 @@ class InsightEngine:
         
         return insights
     
-    def _analyze_temporal_patterns(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    @staticmethod
+    def _decode_tags(tags: Any) -> Any:
+        """Tags may be stored as a JSON string; decode it, or treat it as a single tag"""
+        if isinstance(tags, str):
+            # Only a JSON array or object can yield tags; anything else is a plain tag
+            if tags[:1] not in ('[', '{'):
+                return [tags]
+            try:
+                return orjson.loads(tags)
+            except orjson.JSONDecodeError:
+                return [tags]
+        return tags
+    
+    @staticmethod
+    def _normalize_label_counts(raw_counts: Counter) -> Counter:
+        """Merge raw label counts case- and whitespace-insensitively, dropping blank labels"""
+        # Labels repeat heavily, so the raw strings are counted first and each
+        # distinct one is normalized once instead of once per occurrence
+        counts = Counter()
+        for label, count in raw_counts.items():
+            label = label.strip()
+            if label:
+                counts[label.lower()] += count
+        return counts
+    
+    def _analyze_temporal_patterns(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze temporal patterns in memory creation"""
         insights = []
         
         try:
-            hour_counts = defaultdict(int)
-            day_counts = defaultdict(int)
-            
-            for memory in memories:
-                try:
-                    timestamp = memory.get('timestamp')
-                    if isinstance(timestamp, (int, float)):
-                        dt = datetime.fromtimestamp(timestamp)
-                    elif isinstance(timestamp, str):
-                        dt = datetime.fromisoformat(timestamp)
-                    else:
-                        continue
-                    
-                    hour_counts[dt.hour] += 1
-                    day_counts[dt.strftime('%A')] += 1
-                    
-                except (ValueError, TypeError, KeyError):
-                    continue
+            timestamps = frame.timestamps[~np.isnat(frame.timestamps)]
+            days = timestamps.astype('datetime64[D]').astype(np.int64)
+            hours = timestamps.astype('datetime64[h]').astype(np.int64) - days * 24
+            # Day 0 (1970-01-01) was a Thursday, index 3 in WEEKDAY_NAMES
+            weekdays = (days + 3) % 7
+            hour_counts = np.bincount(hours, minlength=24)
+            day_counts = np.bincount(weekdays, minlength=7)
             
             # Peak hour analysis
-            if hour_counts:
-                peak_hour = max(hour_counts.items(), key=lambda x: x[1])
-                if peak_hour[1] > len(memories) * 0.15:  # 15% of memories in one hour
+            if timestamps.size:
+                peak = int(hour_counts.argmax())
+                peak_hour = (peak, int(hour_counts[peak]))
+                if peak_hour[1] > frame.count * 0.15:  # 15% of memories in one hour
                     insights.append(Insight(
                         type="temporal_pattern",
                         message=f"Peak memory creation time: {peak_hour[0]:02d}:00 with {peak_hour[1]} memories",
@@ -394,9 +619,10 @@ class InsightEngine:
                     ))
             
             # Day pattern analysis
-            if day_counts:
-                peak_day = max(day_counts.items(), key=lambda x: x[1])
-                if peak_day[1] > len(memories) * 0.2:  # 20% of memories on one day
+            if timestamps.size:
+                peak = int(day_counts.argmax())
+                peak_day = (WEEKDAY_NAMES[peak], int(day_counts[peak]))
+                if peak_day[1] > frame.count * 0.2:  # 20% of memories on one day
                     insights.append(Insight(
                         type="temporal_pattern",
                         message=f"Most active day: {peak_day[0]} with {peak_day[1]} memories",
@@ -409,25 +635,19 @@ class InsightEngine:
         
         return insights
     
-    def _analyze_content_patterns(self, memories: List[Dict[str, Any]]) -> List[Insight]:
+    def _analyze_content_patterns(self, frame: MemoryFrame) -> List[Insight]:
         """Analyze content patterns and characteristics"""
         insights = []
         
         try:
-            content_lengths = []
-            word_counts = []
-            
-            for memory in memories:
-                content = memory.get('text') or memory.get('content', '')
-                if isinstance(content, str):
-                    content_lengths.append(len(content))
-                    word_counts.append(len(content.split()))
-            
-            if not content_lengths:
+            if not frame.lengths.size:
                 return insights
             
-            avg_length = statistics.mean(content_lengths)
-            avg_words = statistics.mean(word_counts)
+            content_lengths = frame.lengths.astype(np.float64)
+            word_counts = frame.word_counts.astype(np.float64)
+            avg_length, avg_words, length_std = (
+                float(value) for value in _content_kernel(content_lengths, word_counts)
+            )
             
             # Long content detection
             if avg_length > 500:
@@ -448,8 +668,7 @@ class InsightEngine:
                 ))
             
             # Content variability
-            if len(content_lengths) >= self.config['MIN_SAMPLE_SIZE']:
-                length_std = statistics.stdev(content_lengths)
+            if content_lengths.size >= self.config['MIN_SAMPLE_SIZE']:
                 variability = length_std / avg_length if avg_length > 0 else 0
                 
                 if variability > 1.0:  # High variability
@@ -471,92 +690,62 @@ class InsightEngine:
             return 0.0
         
         try:
-            n = len(values)
-            x_vals = list(range(n))
-            
-            # Calculate slope using least squares method
-            sum_x = sum(x_vals)
-            sum_y = sum(values)
-            sum_xy = sum(x * y for x, y in zip(x_vals, values))
-            sum_x2 = sum(x * x for x in x_vals)
-            
-            denominator = n * sum_x2 - sum_x * sum_x
-            if denominator == 0:
-                return 0.0
-            
-            slope = (n * sum_xy - sum_x * sum_y) / denominator
-            return slope
-            
-        except (ZeroDivisionError, ValueError):
+            return float(_trend_slope(np.asarray(values, dtype=np.float64)))
+        except (TypeError, ValueError):
             return 0.0
     
-    def get_memory_stats(self, memories: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Get comprehensive memory statistics"""
-        if not memories:
-            return {}
-        
+    def get_memory_stats(self, memories: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get comprehensive memory statistics (memories may be any iterable)"""
         try:
+            frame = self._build_frame(memories)
+            if not frame.count:
+                return {}
+            
             stats = {
-                'total_memories': len(memories),
-                'emotions': Counter(memory.get('emotion', 'neutral') for memory in memories),
+                'total_memories': frame.count,
+                'emotions': Counter(dict(zip(frame.emotion_labels, frame.emotion_counts().tolist()))),
                 'avg_importance': 0.0,
                 'memory_age_days': 0.0,
                 'content_stats': {}
             }
             
             # Calculate importance statistics
-            importance_scores = [
-                memory.get('importance_score') or memory.get('importance', 0)
-                for memory in memories
-                if isinstance(memory.get('importance_score') or memory.get('importance', 0), (int, float))
-            ]
-            
-            if importance_scores:
-                stats['avg_importance'] = statistics.mean(importance_scores)
+            scores = frame.importance
+            if scores.size:
+                # Bucket 0: below medium, 1: medium up to high, 2: high and above
+                buckets = np.bincount(
+                    np.searchsorted(
+                        [self.config['MEDIUM_IMPORTANCE_THRESHOLD'], self.config['HIGH_IMPORTANCE_THRESHOLD']],
+                        scores,
+                        side='right'
+                    ),
+                    minlength=3
+                )
+                stats['avg_importance'] = float(scores.mean())
                 stats['importance_distribution'] = {
-                    'high': sum(1 for s in importance_scores if s >= self.config['HIGH_IMPORTANCE_THRESHOLD']),
-                    'medium': sum(1 for s in importance_scores if self.config['MEDIUM_IMPORTANCE_THRESHOLD'] <= s < self.config['HIGH_IMPORTANCE_THRESHOLD']),
-                    'low': sum(1 for s in importance_scores if s < self.config['MEDIUM_IMPORTANCE_THRESHOLD'])
+                    'high': int(buckets[2]),
+                    'medium': int(buckets[1]),
+                    'low': int(buckets[0])
                 }
             
             # Calculate content statistics
-            content_lengths = []
-            for memory in memories:
-                content = memory.get('text') or memory.get('content', '')
-                if isinstance(content, str):
-                    content_lengths.append(len(content))
-            
-            if content_lengths:
+            content_lengths = frame.lengths
+            if content_lengths.size:
                 stats['content_stats'] = {
-                    'avg_length': statistics.mean(content_lengths),
-                    'total_characters': sum(content_lengths),
-                    'shortest': min(content_lengths),
-                    'longest': max(content_lengths)
+                    'avg_length': float(content_lengths.mean()),
+                    'total_characters': int(content_lengths.sum()),
+                    'shortest': int(content_lengths.min()),
+                    'longest': int(content_lengths.max())
                 }
             
-            # Calculate age statistics
-            ages = []
-            now = datetime.now()
-            for memory in memories:
-                try:
-                    timestamp = memory.get('timestamp')
-                    if isinstance(timestamp, (int, float)):
-                        mem_date = datetime.fromtimestamp(timestamp)
-                    elif isinstance(timestamp, str):
-                        mem_date = datetime.fromisoformat(timestamp)
-                    else:
-                        continue
-                    
-                    age_days = (now - mem_date).days
-                    ages.append(age_days)
-                except (ValueError, TypeError, KeyError):
-                    continue
-            
-            if ages:
-                stats['memory_age_days'] = statistics.mean(ages)
+            # Calculate age statistics in whole days, as timedelta.days would
+            age_days = (frame.now - frame.timestamps[frame.dated()]) // np.timedelta64(1, 'D')
+            if age_days.size:
+                fresh = int(np.count_nonzero(age_days <= self.config['MEMORY_FRESHNESS_DAYS']))
+                stats['memory_age_days'] = float(age_days.mean())
                 stats['age_distribution'] = {
-                    'fresh': sum(1 for age in ages if age <= self.config['MEMORY_FRESHNESS_DAYS']),
-                    'old': sum(1 for age in ages if age > self.config['MEMORY_FRESHNESS_DAYS'])
+                    'fresh': fresh,
+                    'old': age_days.size - fresh
                 }
             
             return stats
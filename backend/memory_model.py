@@ -1,12 +1,52 @@
 # Enhanced Memory Model with Validation and Security
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timezone
-from pydantic import BaseModel, Field, validator, root_validator
-import json
+from pydantic import BaseModel, Field, PrivateAttr, validator, root_validator
+from dataclasses import dataclass, field as dataclass_field
+import orjson
 import logging
+import sys
+import time
+
+try:
+    from ciso8601 import parse_datetime as _ciso_parse_datetime
+except ImportError:  # ciso8601 is optional; the stdlib parser handles the same inputs
+    _ciso_parse_datetime = None
 
 logger = logging.getLogger(__name__)
 
+# Accepted emotion labels, mapped to themselves so validation returns one shared
+# string object per label instead of a fresh lowercased copy
+VALID_EMOTIONS = {
+    emotion: emotion for emotion in (
+        'joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust',
+        'neutral', 'positive', 'negative', 'happy', 'sad'
+    )
+}
+
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 string, using the ciso8601 C parser when available"""
+    if _ciso_parse_datetime is not None:
+        try:
+            return _ciso_parse_datetime(value)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+@dataclass(slots=True)
+class MemoryRecord:
+    """Lightweight, already-validated memory for internal hot paths"""
+    id: str
+    content: str
+    emotion: str = "neutral"
+    importance: float = 0.0
+    created_at: Optional[datetime] = None
+    tags: List[str] = dataclass_field(default_factory=list)
+    topics: List[str] = dataclass_field(default_factory=list)
+    emotion_scores: Dict[str, float] = dataclass_field(default_factory=dict)
+    embedding: Optional[List[float]] = None
+    timestamp: Optional[datetime] = None
+
 class Memory(BaseModel):
     """Enhanced Memory model with comprehensive validation and security"""
     
@@ -26,6 +66,12 @@ class Memory(BaseModel):
     timestamp: Optional[Union[str, datetime, float]] = Field(default=None, description="Legacy timestamp field")
     embedding: Optional[List[float]] = Field(default=None, description="Vector embedding")
     
+    # field name -> (datetime, isoformat) for to_dict; keyed on the datetime's identity
+    # so reassigning a field invalidates its entry without extra bookkeeping
+    _iso_cache: Dict[str, tuple] = PrivateAttr(default_factory=dict)
+    # (timestamp, POSIX seconds) for timestamp_epoch, invalidated the same way
+    _epoch_cache: Optional[tuple] = PrivateAttr(default=None)
+    
     class Config:
         allow_population_by_field_name = True
         extra = "forbid"  # Prevent additional fields for security
@@ -52,14 +98,7 @@ class Memory(BaseModel):
         if not v:
             return "neutral"
         # Sanitize and validate emotion values
-        valid_emotions = {
-            'joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust', 
-            'neutral', 'positive', 'negative', 'happy', 'sad'
-        }
-        emotion = str(v).lower().strip()
-        if emotion in valid_emotions:
-            return emotion
-        return "neutral"
+        return VALID_EMOTIONS.get(str(v).lower().strip(), "neutral")
     
     @validator('tags', pre=True)
     def validate_tags(cls, v):
@@ -68,15 +107,16 @@ class Memory(BaseModel):
             return []
         if isinstance(v, str):
             try:
-                v = json.loads(v)
-            except json.JSONDecodeError:
+                v = orjson.loads(v)
+            except orjson.JSONDecodeError:
                 v = [v]  # Single tag as string
         
         if isinstance(v, list):
             sanitized_tags = []
             for tag in v[:20]:  # Limit to 20 tags
                 if isinstance(tag, str) and tag.strip():
-                    clean_tag = tag.strip().lower()[:50]  # Limit tag length
+                    # Limit tag length; interned so memories sharing a tag share one string
+                    clean_tag = sys.intern(tag.strip().lower()[:50])
                     if clean_tag and clean_tag not in sanitized_tags:
                         sanitized_tags.append(clean_tag)
             return sanitized_tags
@@ -89,8 +129,8 @@ class Memory(BaseModel):
             return []
         if isinstance(v, str):
             try:
-                v = json.loads(v)
-            except json.JSONDecodeError:
+                v = orjson.loads(v)
+            except orjson.JSONDecodeError:
                 v = [v]
         
         if isinstance(v, list):
@@ -110,8 +150,8 @@ class Memory(BaseModel):
             return {}
         if isinstance(v, str):
             try:
-                v = json.loads(v)
-            except json.JSONDecodeError:
+                v = orjson.loads(v)
+            except orjson.JSONDecodeError:
                 return {}
         
         if isinstance(v, dict):
@@ -134,8 +174,8 @@ class Memory(BaseModel):
             return {}
         if isinstance(v, str):
             try:
-                v = json.loads(v)
-            except json.JSONDecodeError:
+                v = orjson.loads(v)
+            except orjson.JSONDecodeError:
                 return {}
         
         if isinstance(v, dict):
@@ -145,7 +185,8 @@ class Memory(BaseModel):
                 if isinstance(key, str) and len(key) <= 100:
                     # Convert value to JSON-serializable format
                     try:
-                        json.dumps(value)  # Test if serializable
+                        # Test if serializable the way storage writes it (memory_utils._dumps)
+                        orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
                         sanitized_metadata[key] = value
                         if len(sanitized_metadata) >= 50:  # Limit metadata entries
                             break
@@ -178,7 +219,7 @@ class Memory(BaseModel):
         if isinstance(v, str):
             # Try to parse ISO format
             try:
-                dt = datetime.fromisoformat(v.replace('Z', '+00:00'))
+                dt = _parse_iso_datetime(v)
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
                 return dt
@@ -221,19 +262,25 @@ class Memory(BaseModel):
         """Convert to dictionary with consistent datetime formatting"""
         data = self.dict(by_alias=True)
         
-        # Ensure consistent datetime formatting
-        for field in ['created_at', 'updated_at', 'timestamp']:
-            if field in data and data[field]:
-                if isinstance(data[field], datetime):
-                    data[field] = data[field].isoformat()
-                elif isinstance(data[field], (int, float)):
-                    data[field] = datetime.fromtimestamp(data[field], tz=timezone.utc).isoformat()
+        # Ensure consistent datetime formatting, reusing strings from earlier calls
+        iso_cache = self._iso_cache
+        for field in ('created_at', 'updated_at', 'timestamp'):
+            value = data.get(field)
+            if not value:
+                continue
+            if isinstance(value, datetime):
+                cached = iso_cache.get(field)
+                if cached is None or cached[0] is not value:
+                    cached = iso_cache[field] = (value, value.isoformat())
+                data[field] = cached[1]
+            elif isinstance(value, (int, float)):
+                data[field] = datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
         
         return data
     
     def to_json(self) -> str:
         """Convert to JSON string with proper serialization"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=None)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS).decode()
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Memory':
@@ -244,10 +291,42 @@ class Memory(BaseModel):
     def from_json(cls, json_str: str) -> 'Memory':
         """Create Memory instance from JSON string"""
         try:
-            data = json.loads(json_str)
+            data = orjson.loads(json_str)
             return cls.from_dict(data)
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON format: {e}") from e
+    
+    @classmethod
+    def from_json_batch(cls, json_str: Union[str, bytes]) -> List['Memory']:
+        """Create Memory instances from a JSON array, parsing it in a single call"""
+        try:
+            data = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {e}") from e
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of memories")
+        from_dict = cls.from_dict
+        return [from_dict(item) for item in data]
+    
+    def to_record(self) -> MemoryRecord:
+        """Convert to a slots-based record without re-running validation"""
+        return MemoryRecord(
+            id=self.id,
+            content=self.content,
+            emotion=self.emotion,
+            importance=self.importance,
+            created_at=self.created_at,
+            tags=self.tags,
+            topics=self.topics,
+            emotion_scores=self.emotion_scores,
+            embedding=self.embedding,
+            timestamp=self.timestamp
+        )
+    
+    @classmethod
+    def ingest(cls, data: Dict[str, Any]) -> MemoryRecord:
+        """Validate raw input once at the boundary and return a MemoryRecord"""
+        return cls.from_dict(data).to_record()
     
     def update_timestamp(self):
         """Update the updated_at timestamp"""
@@ -267,17 +346,33 @@ class Memory(BaseModel):
             if clean_tag in self.tags:
                 self.tags.remove(clean_tag)
     
-    def get_age_in_days(self) -> float:
-        """Get the age of the memory in days"""
+    @property
+    def created_epoch(self) -> Optional[float]:
+        """Creation time as POSIX seconds, treating naive datetimes as UTC"""
         if isinstance(self.created_at, datetime):
-            now = datetime.now(timezone.utc)
             if self.created_at.tzinfo is None:
-                created_at = self.created_at.replace(tzinfo=timezone.utc)
-            else:
-                created_at = self.created_at
-            delta = now - created_at
-            return delta.total_seconds() / 86400  # seconds in a day
-        return 0.0
+                return self.created_at.replace(tzinfo=timezone.utc).timestamp()
+            return self.created_at.timestamp()
+        return None
+    
+    @property
+    def timestamp_epoch(self) -> Optional[float]:
+        """Legacy timestamp as POSIX seconds, so filters compare floats instead of datetimes"""
+        value = self.timestamp
+        if not isinstance(value, datetime):
+            return value
+        cached = self._epoch_cache
+        if cached is None or cached[0] is not value:
+            # The validator makes datetimes timezone-aware, so this is exact
+            cached = self._epoch_cache = (value, value.timestamp())
+        return cached[1]
+    
+    def get_age_in_days(self) -> float:
+        """Get the age of the memory in days"""
+        created_epoch = self.created_epoch
+        if created_epoch is None:
+            return 0.0
+        return (time.time() - created_epoch) / 86400  # seconds in a day
     
     def is_important(self, threshold: float = 0.7) -> bool:
         """Check if memory is considered important"""
@@ -291,6 +386,3 @@ class Memory(BaseModel):
         """Detailed string representation"""
         return (f"Memory(id='{self.id}', content='{self.content[:50]}...', "
                 f"emotion='{self.emotion}', importance={self.importance})")
-
-# Legacy alias for backward compatibility
-EnhancedMemory = Memory
@@ -1,18 +1,34 @@
 # Core Business Logic - Complete Implementation with Security Fixes
 import sqlite3
-import json
+import orjson
+import asyncio
 import uuid
+import hashlib
 import time
 import os
+import re
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from sentence_transformers import SentenceTransformer
-import chromadb
+import threading
+import weakref
+import queue
+import contextlib
+from functools import cached_property
+from concurrent.futures import Future
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
 import numpy as np
-from transformers import pipeline
+from cachetools import LRUCache
+try:
+    import faiss
+except ImportError:  # faiss is optional; similarity search stays on the exact EmbeddingIndex
+    faiss = None
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; keyword matching falls back to a regex scan
+    ahocorasick = None
 from memory_model import Memory
-import whisper
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -27,94 +43,835 @@ MEMORY_CONFIG = {
     'DEFAULT_WHISPER_MODEL': 'base',
     'MAX_COLLECTION_RETRIES': 3,
     'DATABASE_TIMEOUT': 30.0,
-    'CHUNK_SIZE': 1000
+    'CHUNK_SIZE': 1000,
+    'EMBEDDING_INDEX_INITIAL_CAPACITY': 1024,
+    'EMBEDDING_SEARCH_BLOCK_ROWS': 4096,
+    'EMBEDDING_INDEX_BACKEND': 'exact',  # 'hnsw' uses a FAISS HNSW graph when faiss is installed
+    'HNSW_M': 32,
+    'HNSW_EF_CONSTRUCTION': 200,
+    'HNSW_EF_SEARCH': 64,
+    'HNSW_MAX_TOMBSTONE_RATIO': 0.25,
+    'HNSW_INT8_VECTORS': True,  # Scalar-quantize HNSW graph vectors to 8 bits (4x smaller)
+    'EXPORT_BATCH_SIZE': 500,
+    'DELETE_BATCH_SIZE': 500,  # IDs per DELETE ... IN (...) statement, under SQLite's variable limit
+    'EMBEDDING_BATCH_SIZE': 64,
+    'EMOTION_BATCH_SIZE': 32,
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'SQLITE_MMAP_SIZE': 268435456,  # 256 MiB
+    'SQLITE_CACHE_SIZE_KB': 65536,  # 64 MiB page cache
+    'SQLITE_WAL_AUTOCHECKPOINT': 1000,  # pages
+    'TEXT_BATCH_WINDOW': 0.05,  # Seconds single-text ingests wait for company
+    'TEXT_BATCH_MAX_SIZE': 64,
+    'QUANTIZE_MODELS': True,  # INT8 dynamic quantization of the CPU encoders
+    'HALF_PRECISION_GPU': True,  # FP16 weights when a CUDA device is available
+    'CPU_BF16_EMBEDDER': False,  # BF16 embedder via intel-extension-for-pytorch on AVX-512 BF16/AMX CPUs
+    'EMOTION_BETTER_TRANSFORMER': False,  # Fused encoder layers via optimum; replaces INT8 quantization on CPU
+    'SQLITE_STATEMENT_CACHE': 512,
+    'VECTOR_WRITE_WINDOW': 0.1,  # Seconds the vector writer gathers queued changes
+    'VECTOR_WRITE_MAX_BATCH': 256,
+    'VECTOR_WRITE_CHUNK_SIZE': 500,  # IDs per collection call; vector stores cap request sizes
+    'VECTOR_WRITE_RETRIES': 3,  # Attempts per collection call before it is logged as failed
+    'VECTOR_WRITE_RETRY_BACKOFF': 0.5,  # Seconds before the first retry, doubled after each
+    'ENCODER_CACHE_SIZE': 4096,  # Texts whose embedding and emotion result are kept
+    'QUERY_CACHE_SIZE': 1024  # Query-only texts whose embedding is kept
 }
 
+# Row layout read by _row_to_dict; listed explicitly so embedding blobs stay off the read path
+MEMORY_COLUMNS = 'id, text, emotion, emotion_scores, tags, topics, importance_score, timestamp, metadata, created_at'
+
+# memories table layout as (column, declaration). Tables created before a column
+# existed get it added on startup; content/importance-era tables are rebuilt
+MEMORY_TABLE_SCHEMA = (
+    ('id', 'TEXT PRIMARY KEY'),
+    ('text', 'TEXT NOT NULL CHECK(length(text) > 0)'),
+    ('emotion', 'TEXT'),
+    ('emotion_scores', 'TEXT'),
+    ('tags', 'TEXT'),
+    ('topics', 'TEXT'),
+    ('importance_score', 'REAL CHECK(importance_score >= 0 AND importance_score <= 1)'),
+    ('timestamp', 'REAL'),
+    ('metadata', 'TEXT'),
+    ('context', 'TEXT'),
+    ('created_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+    ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+    ('version', 'INTEGER DEFAULT 1'),
+    ('embedding_blob', 'BLOB')
+)
+
+# Legacy layout column (or expression) copied into each current column on rebuild
+_LEGACY_MEMORY_COLUMNS = {
+    'id': 'id',
+    'text': 'content',
+    'emotion': 'emotion',
+    'tags': 'tags',
+    'importance_score': 'importance',
+    'timestamp': "CAST(strftime('%s', created_at) AS REAL)",
+    'context': 'context',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'version': 'version'
+}
+
+# Hot statements, built once so each call reuses the connection's compiled statement
+_SQL_SELECT_MEMORY_BY_ID = f'SELECT {MEMORY_COLUMNS} FROM memories WHERE id = ?'
+_SQL_LIST_MEMORIES = f'SELECT {MEMORY_COLUMNS} FROM memories ORDER BY timestamp DESC LIMIT ? OFFSET ?'
+
+# Every row write goes through _persist with these columns, in this order
+_PERSIST_COLUMNS = f'{MEMORY_COLUMNS}, context, embedding_blob'
+_PERSIST_PLACEHOLDERS = ', '.join('?' * len(_PERSIST_COLUMNS.split(',')))
+_SQL_INSERT_MEMORY = f'INSERT INTO memories ({_PERSIST_COLUMNS}) VALUES ({_PERSIST_PLACEHOLDERS})'
+_SQL_UPSERT_MEMORY = f'INSERT OR REPLACE INTO memories ({_PERSIST_COLUMNS}) VALUES ({_PERSIST_PLACEHOLDERS})'
+
+# Fields of the API dictionary format, in row order, and the JSON-encoded ones
+# with the value used when the column is empty
+MEMORY_FIELDS = ('id', 'text', 'emotion', 'emotion_scores', 'tags', 'topics', 'importance_score', 'timestamp', 'metadata')
+_JSON_FIELD_DEFAULTS = {'emotion_scores': dict, 'tags': list, 'topics': list, 'metadata': lambda: None}
+
+# Keyword tables for the tagging and importance heuristics
+TEXT_TAG_KEYWORDS = {
+    'meeting': ('meeting', 'discussion', 'call'),
+    'work': ('project', 'work', 'task'),
+    'decision': ('decision', 'choose', 'decide')
+}
+TEXT_IMPORTANCE_KEYWORDS = frozenset(['important', 'urgent', 'deadline', 'decision', 'critical', 'meeting'])
+CONTENT_IMPORTANCE_KEYWORDS = frozenset(['important', 'remember', 'critical', 'urgent', 'key', 'essential'])
+
+# One lookahead alternation over every keyword: a single pass over the text reports
+# overlapping matches too. No keyword is a prefix of another, so none can shadow one.
+_HEURISTIC_KEYWORDS = set().union(*TEXT_TAG_KEYWORDS.values(), TEXT_IMPORTANCE_KEYWORDS, CONTENT_IMPORTANCE_KEYWORDS)
+
+def _build_keyword_automaton():
+    """Compile the heuristic keywords into one Aho-Corasick automaton, if available"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in _HEURISTIC_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+_KEYWORD_SCANNER = re.compile('(?=({}))'.format('|'.join(
+    re.escape(keyword) for keyword in sorted(_HEURISTIC_KEYWORDS, key=len, reverse=True)
+)))
+
+def _dumps(value: Any) -> str:
+    """Encode a JSON column value with orjson; sqlite3 needs str, as bytes would be stored as a BLOB"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _inference_mode():
+    """Context that disables autograd bookkeeping around model calls when torch is present"""
+    try:
+        import torch
+        return torch.inference_mode()
+    except (ImportError, AttributeError):
+        return contextlib.nullcontext()
+
+def _bf16_autocast():
+    """Context running CPU matmuls in bfloat16"""
+    import torch
+    return torch.autocast('cpu', dtype=torch.bfloat16)
+
+def _cuda_available() -> bool:
+    """Whether torch can see a CUDA device"""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+def match_keywords(text: str) -> frozenset:
+    """Return the heuristic keywords that occur anywhere in the text, case-insensitively"""
+    text = text.lower()
+    if _KEYWORD_AUTOMATON is not None:
+        # Single DFA pass instead of trying every alternative at each position
+        return frozenset(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text))
+    return frozenset(_KEYWORD_SCANNER.findall(text))
+
+def importance_scores(content_lengths: np.ndarray, context_lengths: np.ndarray,
+                      tag_counts: np.ndarray, keyword_counts: np.ndarray) -> np.ndarray:
+    """Vectorized MemoryProcessor._calculate_importance over a batch, clamped to [0, 1]
+    
+    context_lengths should be 0 where the context is blank.
+    """
+    importance = np.minimum(np.asarray(content_lengths, dtype=np.float64) / 1000, 0.3)
+    importance += np.minimum(np.asarray(context_lengths, dtype=np.float64) / 500, 0.2)
+    importance += np.minimum(np.asarray(tag_counts, dtype=np.float64) * 0.1, 0.2)
+    importance += np.minimum(np.asarray(keyword_counts, dtype=np.float64) * 0.1, 0.3)
+    return np.clip(importance, 0.0, 1.0)
+
+class EmbeddingIndex:
+    """In-memory embedding matrix for brute-force vector similarity search.
+    
+    Embeddings are L2-normalized on insert and stored as int8 with one float32
+    scale per row, a quarter of the float32 footprint. Queries stay float32 and
+    are scored block by block, so only int8 rows stream from main memory and
+    cosine similarity needs no per-row norm.
+    """
+    
+    def __init__(self, initial_capacity: Optional[int] = None):
+        self._capacity = initial_capacity or MEMORY_CONFIG['EMBEDDING_INDEX_INITIAL_CAPACITY']
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._positions
+    
+    def _grow(self):
+        """Double the matrix capacity so appends stay amortized O(1)"""
+        self._capacity *= 2
+        vectors = np.empty((self._capacity, self._vectors.shape[1]), dtype=np.int8)
+        vectors[:len(self._ids)] = self._vectors[:len(self._ids)]
+        scales = np.empty(self._capacity, dtype=np.float32)
+        scales[:len(self._ids)] = self._scales[:len(self._ids)]
+        self._vectors, self._scales = vectors, scales
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Return the embedding as a flat float32 unit vector"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        return vector / (np.linalg.norm(vector) + 1e-12)
+    
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Symmetric per-vector int8 quantization"""
+        scale = float(np.max(np.abs(vector))) / 127 or 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+    
+    def add(self, memory_id: str, embedding) -> None:
+        """Insert or replace the embedding for a memory"""
+        quantized, scale = self._quantize(self._normalize(embedding))
+        
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.empty((self._capacity, quantized.shape[0]), dtype=np.int8)
+                self._scales = np.empty(self._capacity, dtype=np.float32)
+            elif quantized.shape[0] != self._vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {quantized.shape[0]} does not match index dimension {self._vectors.shape[1]}"
+                )
+            
+            position = self._positions.get(memory_id)
+            if position is None:
+                if len(self._ids) == self._capacity:
+                    self._grow()
+                position = len(self._ids)
+                self._ids.append(memory_id)
+                self._positions[memory_id] = position
+            
+            self._vectors[position] = quantized
+            self._scales[position] = scale
+    
+    def remove(self, memory_ids: List[str]) -> None:
+        """Remove embeddings by moving the last row into each freed slot"""
+        with self._lock:
+            for memory_id in memory_ids:
+                position = self._positions.pop(memory_id, None)
+                if position is None:
+                    continue
+                last = len(self._ids) - 1
+                if position != last:
+                    moved_id = self._ids[last]
+                    self._vectors[position] = self._vectors[last]
+                    self._scales[position] = self._scales[last]
+                    self._ids[position] = moved_id
+                    self._positions[moved_id] = position
+                self._ids.pop()
+    
+    def search(self, query_embedding, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` (memory_id, cosine similarity) pairs, best first"""
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or limit <= 0:
+                return []
+            
+            # Dequantize one cache-sized block at a time for the BLAS call
+            block_rows = MEMORY_CONFIG['EMBEDDING_SEARCH_BLOCK_ROWS']
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, block_rows):
+                stop = min(start + block_rows, count)
+                scores[start:stop] = self._vectors[start:stop].astype(np.float32) @ query
+            scores *= self._scales[:count]
+            
+            k = min(limit, count)
+            if k < count:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(count)
+            top = top[np.argsort(-scores[top])]
+            
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+class HnswEmbeddingIndex:
+    """Approximate nearest-neighbour index over normalized embeddings (FAISS HNSW).
+    
+    Drop-in replacement for EmbeddingIndex on large collections. HNSW graphs
+    cannot delete nodes, so removals and replacements tombstone the old label
+    and searches over-fetch past them; once tombstones pass a fraction of the
+    graph it is rebuilt from the live vectors. Graph vectors are stored as
+    8-bit scalar-quantized codes unless HNSW_INT8_VECTORS is off.
+    """
+    
+    def __init__(self, m: Optional[int] = None, ef_construction: Optional[int] = None,
+                 ef_search: Optional[int] = None, int8: Optional[bool] = None):
+        if faiss is None:
+            raise RuntimeError("HnswEmbeddingIndex requires faiss")
+        self._int8 = MEMORY_CONFIG['HNSW_INT8_VECTORS'] if int8 is None else int8
+        self._m = m or MEMORY_CONFIG['HNSW_M']
+        self._ef_construction = ef_construction or MEMORY_CONFIG['HNSW_EF_CONSTRUCTION']
+        self._ef_search = ef_search or MEMORY_CONFIG['HNSW_EF_SEARCH']
+        self._index = None
+        self._dimension: Optional[int] = None
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._tombstones = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._labels)
+    
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._labels
+    
+    def _new_index(self):
+        if self._int8:
+            # Components of unit vectors lie in [-1, 1], so the uniform 8-bit
+            # quantizer is trained on those bounds rather than on data
+            graph = faiss.IndexHNSWSQ(
+                self._dimension, faiss.ScalarQuantizer.QT_8bit_uniform, self._m, faiss.METRIC_INNER_PRODUCT
+            )
+            bounds = np.stack([np.full(self._dimension, -1.0), np.full(self._dimension, 1.0)]).astype(np.float32)
+            graph.train(bounds)
+        else:
+            graph = faiss.IndexHNSWFlat(self._dimension, self._m, faiss.METRIC_INNER_PRODUCT)
+        graph.hnsw.efConstruction = self._ef_construction
+        return faiss.IndexIDMap2(graph)
+    
+    def _retire(self, label: int):
+        del self._ids[label]
+        self._tombstones += 1
+    
+    def _maybe_rebuild(self):
+        """Rebuild the graph from live vectors once tombstones dominate"""
+        if self._tombstones <= MEMORY_CONFIG['HNSW_MAX_TOMBSTONE_RATIO'] * max(self._index.ntotal, 1):
+            return
+        labels = np.fromiter(self._ids, dtype=np.int64, count=len(self._ids))
+        index = self._new_index()
+        if len(labels):
+            vectors = np.vstack([self._index.reconstruct(int(label)) for label in labels])
+            index.add_with_ids(vectors, labels)
+        self._index, self._tombstones = index, 0
+    
+    def add(self, memory_id: str, embedding) -> None:
+        """Insert or replace the embedding for a memory"""
+        vector = EmbeddingIndex._normalize(embedding)
+        
+        with self._lock:
+            if self._index is None:
+                self._dimension = vector.shape[0]
+                self._index = self._new_index()
+            elif vector.shape[0] != self._dimension:
+                raise ValueError(
+                    f"Embedding dimension {vector.shape[0]} does not match index dimension {self._dimension}"
+                )
+            
+            previous = self._labels.get(memory_id)
+            if previous is not None:
+                self._retire(previous)
+            label = self._next_label
+            self._next_label += 1
+            self._index.add_with_ids(vector[np.newaxis], np.array([label], dtype=np.int64))
+            self._labels[memory_id] = label
+            self._ids[label] = memory_id
+            self._maybe_rebuild()
+    
+    def remove(self, memory_ids: List[str]) -> None:
+        """Tombstone embeddings; the graph is compacted on a later rebuild"""
+        with self._lock:
+            for memory_id in memory_ids:
+                label = self._labels.pop(memory_id, None)
+                if label is not None:
+                    self._retire(label)
+            if self._index is not None:
+                self._maybe_rebuild()
+    
+    def search(self, query_embedding, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` (memory_id, cosine similarity) pairs, best first"""
+        query = EmbeddingIndex._normalize(query_embedding)
+        
+        with self._lock:
+            if not self._labels or limit <= 0:
+                return []
+            # Every tombstone could rank ahead of a live vector
+            k = min(limit + self._tombstones, self._index.ntotal)
+            params = faiss.SearchParametersHNSW(efSearch=max(self._ef_search, k))
+            scores, labels = self._index.search(query[np.newaxis], k, params=params)
+            
+            results = []
+            for score, label in zip(scores[0], labels[0]):
+                memory_id = self._ids.get(int(label))
+                if memory_id is not None:
+                    # Quantized codes can score a hair above 1
+                    results.append((memory_id, min(float(score), 1.0)))
+                    if len(results) == limit:
+                        break
+            return results
+
+def create_embedding_index():
+    """Build the similarity index selected by EMBEDDING_INDEX_BACKEND"""
+    if MEMORY_CONFIG['EMBEDDING_INDEX_BACKEND'] == 'hnsw':
+        if faiss is not None:
+            return HnswEmbeddingIndex()
+        logger.warning("faiss is not installed; using exact similarity search")
+    return EmbeddingIndex()
+
+class TextMemoryBatcher:
+    """Coalesce concurrent single-text ingests into one bulk call.
+    
+    The first caller of a window sleeps for the window, then runs everything
+    queued meanwhile as one batch on its own thread; a caller that fills the
+    batch runs it immediately. Every caller blocks until its own result is set.
+    Async callers share the same batches but wait on the event loop, so a
+    pending request does not hold a worker thread.
+    """
+    
+    def __init__(self, process_batch, window: Optional[float] = None, max_size: Optional[int] = None):
+        self._process_batch = process_batch
+        self._window = MEMORY_CONFIG['TEXT_BATCH_WINDOW'] if window is None else window
+        self._max_size = max_size or MEMORY_CONFIG['TEXT_BATCH_MAX_SIZE']
+        self._pending: List[Tuple[str, Optional[dict], Future]] = []
+        self._lock = threading.Lock()
+    
+    def submit(self, text: str, metadata: Optional[dict] = None) -> Dict[str, Any]:
+        """Queue one text and return its processed memory"""
+        if self._window <= 0:
+            return self._process_batch([text], [metadata])[0]
+        
+        future = Future()
+        with self._lock:
+            self._pending.append((text, metadata, future))
+            leader = len(self._pending) == 1
+            full = len(self._pending) >= self._max_size
+        
+        if full:
+            self._flush()
+        elif leader:
+            time.sleep(self._window)
+            self._flush()
+        return future.result()
+    
+    async def asubmit(self, text: str, metadata: Optional[dict] = None) -> Dict[str, Any]:
+        """Queue one text from a coroutine and await its processed memory"""
+        if self._window <= 0:
+            return (await asyncio.to_thread(self._process_batch, [text], [metadata]))[0]
+        
+        future = Future()
+        with self._lock:
+            self._pending.append((text, metadata, future))
+            leader = len(self._pending) == 1
+            full = len(self._pending) >= self._max_size
+        
+        if full:
+            await asyncio.shield(asyncio.to_thread(self._flush))
+        elif leader:
+            # The batch belongs to every queued caller, so it is flushed even when
+            # the leader is cancelled mid-window; otherwise followers wait for a full batch
+            try:
+                await asyncio.sleep(self._window)
+            finally:
+                await asyncio.shield(asyncio.to_thread(self._flush))
+        return await asyncio.wrap_future(future)
+    
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        try:
+            results = self._process_batch([text for text, _, _ in batch], [metadata for _, metadata, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+class VectorWriteQueue:
+    """Apply vector collection writes on a background thread.
+    
+    SQLite is the source of truth and the in-memory index serves similarity
+    queries, so callers only enqueue collection changes. The writer gathers
+    whatever arrives within a short window and merges consecutive operations
+    of the same kind into one collection call, keeping their relative order.
+    """
+    
+    def __init__(self, get_collection, window: Optional[float] = None, max_batch: Optional[int] = None):
+        # Resolved on the writer thread so a lazily created collection is only built when written to
+        self._get_collection = get_collection
+        self._window = MEMORY_CONFIG['VECTOR_WRITE_WINDOW'] if window is None else window
+        self._max_batch = max_batch or MEMORY_CONFIG['VECTOR_WRITE_MAX_BATCH']
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='vector-writer', daemon=True)
+        self._thread.start()
+    
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[dict]):
+        self._queue.put(('add', ids, embeddings, documents, metadatas))
+    
+    def update(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[dict]):
+        self._queue.put(('update', ids, embeddings, documents, metadatas))
+    
+    def delete(self, ids: List[str]):
+        self._queue.put(('delete', ids, None, None, None))
+    
+    def flush(self):
+        """Block until every queued write has been applied"""
+        self._queue.join()
+    
+    def close(self):
+        """Apply pending writes and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+    
+    def _run(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while batch[-1] is not None and len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if batch[-1] is None:
+                running = False
+            try:
+                self._apply([item for item in batch if item is not None])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _apply(self, operations):
+        chunk = MEMORY_CONFIG['VECTOR_WRITE_CHUNK_SIZE']
+        for op, run in groupby(operations, key=itemgetter(0)):
+            run = list(run)
+            ids = [memory_id for item in run for memory_id in item[1]]
+            if op != 'delete':
+                embeddings = [embedding for item in run for embedding in item[2]]
+                documents = [document for item in run for document in item[3]]
+                metadatas = [metadata for item in run for metadata in item[4]]
+            for start in range(0, len(ids), chunk):
+                end = start + chunk
+                if op == 'delete':
+                    self._call(op, ids=ids[start:end])
+                else:
+                    self._call(
+                        op,
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end],
+                        documents=documents[start:end],
+                        metadatas=metadatas[start:end]
+                    )
+    
+    def _call(self, op: str, **kwargs):
+        """Run one collection call, retrying transient failures with exponential backoff"""
+        attempts = max(MEMORY_CONFIG['VECTOR_WRITE_RETRIES'], 1)
+        delay = MEMORY_CONFIG['VECTOR_WRITE_RETRY_BACKOFF']
+        for attempt in range(1, attempts + 1):
+            try:
+                getattr(self._get_collection(), op)(**kwargs)
+                return
+            except Exception as e:
+                if attempt == attempts:
+                    # SQLite and the in-memory index stay authoritative; the ids are logged
+                    # so the collection copy can be repaired
+                    logger.error("Vector %s of %d ids failed after %d attempts: %s; ids: %s",
+                                 op, len(kwargs['ids']), attempts, e, kwargs['ids'])
+                    return
+                logger.warning("Vector %s of %d ids failed (attempt %d/%d), retrying: %s",
+                               op, len(kwargs['ids']), attempt, attempts, e)
+                time.sleep(delay)
+                delay *= 2
+
+class _ThreadConnection:
+    """Holds one thread's connection; freed with the thread's locals when the thread exits"""
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+def _release_connection(conn: sqlite3.Connection, connections: set, lock: threading.Lock):
+    """Close a connection whose thread has exited and stop tracking it"""
+    with lock:
+        connections.discard(conn)
+    conn.close()
+
 class MemoryProcessor:
-    def __init__(self, db_path='memory_system.db', collection_name=None):
+    def __init__(self, db_path='memory_system.db', collection_name=None, fast_ingest: bool = False):
         self.db_path = db_path
         self.collection_name = collection_name or f"{MEMORY_CONFIG['COLLECTION_NAME_PREFIX']}_{int(time.time())}"
+        # Each thread gets its own connection so WAL readers run in parallel and only
+        # writers serialize. A thread's connection is closed when the thread exits,
+        # so short-lived pool workers do not leave connections behind. Fast ingest
+        # holds an exclusive lock and an in-memory database is private to its
+        # connection, so both keep one shared connection.
+        self._thread_local = threading.local()
+        self._connections: set = set()
+        self._connections_lock = threading.Lock()
+        self._shared_conn: Optional[sqlite3.Connection] = None
         
         # Initialize database connection with timeout
         try:
-            self.conn = sqlite3.connect(
-                db_path, 
-                check_same_thread=False,
-                timeout=MEMORY_CONFIG['DATABASE_TIMEOUT']
-            )
-            # Enable WAL mode for better concurrency
-            self.conn.execute('PRAGMA journal_mode=WAL')
-            self.conn.execute('PRAGMA foreign_keys=ON')
+            conn = self._connect()
+            if fast_ingest:
+                # One-off bulk imports only: no journal and an exclusive lock mean a
+                # crash mid-import can corrupt the file and other readers are blocked
+                conn.execute('PRAGMA journal_mode=OFF')
+                conn.execute('PRAGMA locking_mode=EXCLUSIVE')
+                logger.warning("Fast ingest mode enabled for %s; journaling is off", db_path)
+            if fast_ingest or db_path == ':memory:':
+                self._shared_conn = conn
+            else:
+                self._bind_thread_connection(conn)
         except sqlite3.Error as e:
             logger.error("Failed to connect to database: %s", e)
             raise RuntimeError(f"Database connection failed: {e}") from e
         
-        # Initialize AI models with fallbacks
-        self._initialize_models()
+        # Models and the vector collection load on first use (see the cached properties
+        # below), so handlers that only list or delete memories never pay for them
+        self._lazy_lock = threading.RLock()
+        self._bf16_embedder = False
         
-        # Initialize vector database with collision handling
-        self._initialize_vector_db()
+        # Embedding bytes and emotion result per text digest, so repeated texts skip the models
+        self._encoder_cache = LRUCache(maxsize=MEMORY_CONFIG['ENCODER_CACHE_SIZE'])
+        # Embedding bytes for texts only ever seen as similarity queries
+        self._query_cache = LRUCache(maxsize=MEMORY_CONFIG['QUERY_CACHE_SIZE'])
+        self._encoder_cache_lock = threading.Lock()
+        self.vector_writer = VectorWriteQueue(lambda: self.collection)
+        
+        # Concurrent process_text_memory calls share model and database round-trips
+        self.text_batcher = TextMemoryBatcher(self.bulk_process_text_memories)
         
         # Initialize database schema with migrations
         self._init_database()
         
-    def _initialize_models(self):
-        """Initialize AI models with proper error handling and fallbacks"""
+        # In-memory matrix used for similarity queries
+        self.embedding_index = create_embedding_index()
+        self._load_embedding_index()
+        
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the shared pragmas and track it for close()"""
+        conn = sqlite3.connect(
+            self.db_path, 
+            check_same_thread=False,  # close() may run on another thread
+            timeout=MEMORY_CONFIG['DATABASE_TIMEOUT'],
+            cached_statements=MEMORY_CONFIG['SQLITE_STATEMENT_CACHE']
+        )
+        # Enable WAL mode for better concurrency; with WAL, synchronous=NORMAL
+        # only syncs at checkpoints and still survives application crashes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f"PRAGMA busy_timeout={int(MEMORY_CONFIG['SQLITE_BUSY_TIMEOUT_MS'])}")
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(f"PRAGMA mmap_size={int(MEMORY_CONFIG['SQLITE_MMAP_SIZE'])}")
+        conn.execute(f"PRAGMA cache_size={-int(MEMORY_CONFIG['SQLITE_CACHE_SIZE_KB'])}")
+        conn.execute(f"PRAGMA wal_autocheckpoint={int(MEMORY_CONFIG['SQLITE_WAL_AUTOCHECKPOINT'])}")
+        conn.execute('PRAGMA foreign_keys=ON')
+        with self._connections_lock:
+            self._connections.add(conn)
+        return conn
+    
+    def _bind_thread_connection(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Make conn the calling thread's connection, closed once the thread exits"""
+        holder = self._thread_local.holder = _ThreadConnection(conn)
+        weakref.finalize(holder, _release_connection, conn, self._connections, self._connections_lock)
+        return conn
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's database connection, opened on first use"""
+        if self._shared_conn is not None:
+            return self._shared_conn
+        holder = getattr(self._thread_local, 'holder', None)
+        if holder is None:
+            return self._bind_thread_connection(self._connect())
+        return holder.conn
+    
+    @cached_property
+    def embedder(self):
+        """Sentence embedding model, loaded on first use"""
+        with self._lazy_lock:
+            # Another thread may have finished loading while this one waited
+            if 'embedder' in self.__dict__:
+                return self.__dict__['embedder']
+            try:
+                logger.info("Loading embedding model...")
+                # Imported here so processes that never embed skip loading the model stack
+                from sentence_transformers import SentenceTransformer
+                if _cuda_available():
+                    embedder = SentenceTransformer(MEMORY_CONFIG['DEFAULT_EMBEDDING_MODEL'], device='cuda')
+                    if MEMORY_CONFIG['HALF_PRECISION_GPU']:
+                        embedder = embedder.half()
+                    return embedder
+                
+                embedder = SentenceTransformer(MEMORY_CONFIG['DEFAULT_EMBEDDING_MODEL'], device='cpu')
+                if MEMORY_CONFIG['CPU_BF16_EMBEDDER']:
+                    optimized = self._optimize_bf16(embedder)
+                    if optimized is not None:
+                        self._bf16_embedder = True
+                        return optimized
+                if MEMORY_CONFIG['QUANTIZE_MODELS']:
+                    embedder = self._quantize_model(embedder)
+                return embedder
+            except Exception as e:
+                logger.error("Failed to load embedding model: %s", e)
+                raise RuntimeError(f"Embedding model initialization failed: {e}") from e
+    
+    @cached_property
+    def emotion_analyzer(self):
+        """Emotion classification pipeline with a keyword fallback, loaded on first use"""
+        with self._lazy_lock:
+            if 'emotion_analyzer' in self.__dict__:
+                return self.__dict__['emotion_analyzer']
+            try:
+                logger.info("Loading emotion analyzer...")
+                from transformers import pipeline
+                if _cuda_available():
+                    import torch
+                    emotion_analyzer = pipeline(
+                        "text-classification",
+                        model=MEMORY_CONFIG['DEFAULT_EMOTION_MODEL'],
+                        device=0,
+                        torch_dtype=torch.float16 if MEMORY_CONFIG['HALF_PRECISION_GPU'] else None
+                    )
+                    fused = self._to_better_transformer(emotion_analyzer.model) if MEMORY_CONFIG['EMOTION_BETTER_TRANSFORMER'] else None
+                    if fused is not None:
+                        emotion_analyzer.model = fused
+                    return emotion_analyzer
+                
+                emotion_analyzer = pipeline(
+                    "text-classification", 
+                    model=MEMORY_CONFIG['DEFAULT_EMOTION_MODEL'],
+                    device=-1
+                )
+                if MEMORY_CONFIG['EMOTION_BETTER_TRANSFORMER'] and hasattr(emotion_analyzer, 'model'):
+                    # The fused kernels need float weights, so this path skips INT8 quantization
+                    fused = self._to_better_transformer(emotion_analyzer.model)
+                    if fused is not None:
+                        emotion_analyzer.model = fused
+                        return emotion_analyzer
+                if MEMORY_CONFIG['QUANTIZE_MODELS'] and hasattr(emotion_analyzer, 'model'):
+                    emotion_analyzer.model = self._quantize_model(emotion_analyzer.model)
+                return emotion_analyzer
+            except Exception as e:
+                logger.error("Failed to load emotion analyzer: %s", e)
+                # Create a fallback emotion analyzer
+                logger.warning("Using fallback emotion analyzer")
+                return self._create_fallback_emotion_analyzer()
+    
+    @cached_property
+    def collection(self):
+        """Vector collection, created on first use"""
+        with self._lazy_lock:
+            if 'collection' in self.__dict__:
+                return self.__dict__['collection']
+            return self._initialize_vector_db()
+    
+    @staticmethod
+    def _quantize_model(model):
+        """Return an INT8 dynamically quantized copy of a CPU model, or the model itself"""
         try:
-            logger.info("Loading embedding model...")
-            self.embedder = SentenceTransformer(MEMORY_CONFIG['DEFAULT_EMBEDDING_MODEL'])
+            import torch
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
         except Exception as e:
-            logger.error("Failed to load embedding model: %s", e)
-            raise RuntimeError(f"Embedding model initialization failed: {e}") from e
-        
+            logger.warning("INT8 quantization unavailable, keeping FP32 model: %s", e)
+            return model
+    
+    @staticmethod
+    def _to_better_transformer(model):
+        """Return the model with BetterTransformer fused encoder layers, or None when optimum is unavailable"""
         try:
-            logger.info("Loading emotion analyzer...")
-            self.emotion_analyzer = pipeline(
-                "text-classification", 
-                model=MEMORY_CONFIG['DEFAULT_EMOTION_MODEL'],
-                device=-1  # Use CPU to avoid GPU issues
-            )
+            from optimum.bettertransformer import BetterTransformer
+            return BetterTransformer.transform(model, keep_original_model=False)
         except Exception as e:
-            logger.error("Failed to load emotion analyzer: %s", e)
-            # Create a fallback emotion analyzer
-            logger.warning("Using fallback emotion analyzer")
-            self.emotion_analyzer = self._create_fallback_emotion_analyzer()
+            logger.warning("BetterTransformer unavailable, falling back: %s", e)
+            return None
+    
+    @staticmethod
+    def _optimize_bf16(model):
+        """Return an IPEX bfloat16-optimized model, or None when IPEX is unavailable"""
+        try:
+            import torch
+            import intel_extension_for_pytorch as ipex
+            return ipex.optimize(model.eval(), dtype=torch.bfloat16)
+        except Exception as e:
+            logger.warning("BF16 optimization unavailable, falling back: %s", e)
+            return None
+    
+    def _embed(self, texts, **kwargs) -> np.ndarray:
+        """Run the embedder and return float32 NumPy output whatever the model precision"""
+        with _inference_mode(), (_bf16_autocast() if self._bf16_embedder else contextlib.nullcontext()):
+            # Tensors stay on the model's device until the single float32 copy below
+            embeddings = self.embedder.encode(texts, show_progress_bar=False, convert_to_tensor=True, **kwargs)
+        if hasattr(embeddings, 'float'):
+            embeddings = embeddings.float().cpu().numpy()
+        return np.asarray(embeddings, dtype=np.float32)
     
     def _create_fallback_emotion_analyzer(self):
         """Create a simple fallback emotion analyzer"""
         class FallbackEmotionAnalyzer:
-            def __call__(self, text):
+            def __call__(self, text, **kwargs):
+                # Like the pipeline, a list of texts gets one top result per text
+                if isinstance(text, list):
+                    return [self._classify(item) for item in text]
+                return [self._classify(text)]
+            
+            @staticmethod
+            def _classify(text):
                 # Simple keyword-based emotion detection
                 text_lower = text.lower()
                 if any(word in text_lower for word in ['happy', 'joy', 'great', 'excellent']):
-                    return [{'label': 'joy', 'score': 0.8}]
+                    return {'label': 'joy', 'score': 0.8}
                 elif any(word in text_lower for word in ['sad', 'upset', 'terrible', 'awful']):
-                    return [{'label': 'sadness', 'score': 0.8}]
+                    return {'label': 'sadness', 'score': 0.8}
                 elif any(word in text_lower for word in ['angry', 'mad', 'furious', 'annoyed']):
-                    return [{'label': 'anger', 'score': 0.8}]
+                    return {'label': 'anger', 'score': 0.8}
                 else:
-                    return [{'label': 'neutral', 'score': 0.7}]
+                    return {'label': 'neutral', 'score': 0.7}
         
         return FallbackEmotionAnalyzer()
     
     def _initialize_vector_db(self):
-        """Initialize vector database with proper collision handling"""
+        """Connect to or create the vector collection with proper collision handling"""
         try:
+            import chromadb
             self.vector_client = chromadb.Client()
             
             # Try to get existing collection first
             retry_count = 0
             while retry_count < MEMORY_CONFIG['MAX_COLLECTION_RETRIES']:
                 try:
-                    self.collection = self.vector_client.get_collection(self.collection_name)
+                    collection = self.vector_client.get_collection(self.collection_name)
                     logger.info("Connected to existing ChromaDB collection: %s", self.collection_name)
                     break
                 except ValueError:
                     # Collection doesn't exist, try to create it
                     try:
-                        self.collection = self.vector_client.create_collection(
+                        collection = self.vector_client.create_collection(
                             name=self.collection_name,
-                            metadata={"description": "Memory embeddings collection"}
+                            metadata={"description": "Memory embeddings collection", "hnsw:space": "cosine"}
                         )
                         logger.info("Created new ChromaDB collection: %s", self.collection_name)
                         break
@@ -132,40 +889,67 @@ class MemoryProcessor:
             
             if retry_count >= MEMORY_CONFIG['MAX_COLLECTION_RETRIES']:
                 raise RuntimeError("Failed to create unique ChromaDB collection after retries")
+            return collection
                 
         except Exception as e:
             logger.error("Failed to initialize vector database: %s", e)
             raise
         
-    def close(self):
-        """Close database connections and resources"""
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
-        # Additional cleanup for other resources if needed
-
+    @staticmethod
+    def _embedding_to_blob(embedding) -> bytes:
+        """Pack an embedding as float16 bytes, half the size of the float32 vector"""
+        return np.asarray(embedding, dtype=np.float16).ravel().tobytes()
+    
+    @staticmethod
+    def _blob_to_embedding(blob: bytes) -> np.ndarray:
+        """Unpack a float16 embedding blob into a float32 vector"""
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    
+    def _load_embedding_index(self):
+        """Populate the similarity index from stored embedding blobs and the vector collection"""
+        try:
+            rows = self.conn.execute(
+                'SELECT id, embedding_blob FROM memories WHERE embedding_blob IS NOT NULL'
+            )
+            for memory_id, blob in rows:
+                self.embedding_index.add(memory_id, self._blob_to_embedding(blob))
+        except sqlite3.Error as e:
+            logger.warning("Could not preload embeddings from database: %s", e)
+        
+        # Memories written before the blob column existed only live in the collection;
+        # when every row carries its blob the collection is not opened at all
+        missing_blobs = self.conn.execute(
+            'SELECT 1 FROM memories WHERE embedding_blob IS NULL LIMIT 1'
+        ).fetchone()
+        if missing_blobs:
+            try:
+                stored = self.collection.get(include=['embeddings'])
+                for memory_id, embedding in zip(stored['ids'], stored['embeddings'] or []):
+                    if memory_id not in self.embedding_index:
+                        self.embedding_index.add(memory_id, embedding)
+            except Exception as e:
+                logger.warning("Could not preload embeddings from vector database: %s", e)
+        
+        if len(self.embedding_index):
+            logger.info("Loaded %d embeddings into similarity index", len(self.embedding_index))
+    
     def _init_database(self):
         """Initialize database tables with proper schema and migrations"""
         try:
             # Create main memories table with proper constraints
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS memories (
-                id TEXT PRIMARY KEY,
-                content TEXT NOT NULL CHECK(length(content) > 0),
-                emotion TEXT,
-                importance REAL CHECK(importance >= 0 AND importance <= 1),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                tags TEXT,
-                context TEXT,
-                version INTEGER DEFAULT 1
-            )''')
+            columns = ', '.join(f'{name} {declaration}' for name, declaration in MEMORY_TABLE_SCHEMA)
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS memories ({columns})')
+            self._migrate_memories_table()
             
             # Create indexes for better query performance
             self.conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_created_at 
                                 ON memories(created_at)''')
             self.conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_emotion 
                                 ON memories(emotion)''')
-            self.conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_importance 
-                                ON memories(importance)''')
+            self._create_query_indexes()
+            self._create_text_search_index()
+            self._create_tag_index()
+            self._create_version_counter()
             
             # Create schema version table for migrations
             self.conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
@@ -183,6 +967,184 @@ class MemoryProcessor:
             logger.error("Database initialization failed: %s", e)
             raise RuntimeError(f"Database schema creation failed: {e}") from e
     
+    def _create_query_indexes(self):
+        """Index the columns the list/search/trend queries filter and sort on"""
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(memories)')}
+        existing = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        query_indexes = {
+            'idx_memories_timestamp': (('timestamp',), 'memories(timestamp DESC)'),
+            # MemoryFilter's emotion + date range + min_importance predicate, answered
+            # from the index without row lookups for rejected memories
+            'idx_memories_emotion_timestamp_importance': (
+                ('emotion', 'timestamp', 'importance_score'),
+                'memories(emotion, timestamp DESC, importance_score)'
+            ),
+            'idx_memories_importance_score': (('importance_score',), 'memories(importance_score)'),
+            # Covers the emotion trend query's timestamp range scan without row lookups
+            'idx_memories_timestamp_emotion': (('timestamp', 'emotion'), 'memories(timestamp, emotion)')
+        }
+        
+        created = False
+        # Superseded by idx_memories_emotion_timestamp_importance, which has it as a prefix
+        if 'idx_memories_emotion_timestamp' in existing and columns.issuperset(('emotion', 'timestamp', 'importance_score')):
+            self.conn.execute('DROP INDEX idx_memories_emotion_timestamp')
+        
+        for name, (required_columns, target) in query_indexes.items():
+            # Older databases may predate these columns; skip rather than fail startup
+            if name in existing or not columns.issuperset(required_columns):
+                continue
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+            created = True
+        
+        # Give the planner statistics for new indexes without rescanning on every start
+        if created:
+            self.conn.execute('ANALYZE memories')
+    
+    def _create_text_search_index(self):
+        """Mirror memory text into a trigram FTS5 table so substring search can use an index"""
+        self._has_text_search = False
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(memories)')}
+        if 'text' not in columns:
+            return
+        
+        try:
+            fts_columns = [row[1] for row in self.conn.execute('PRAGMA table_info(memories_fts)')]
+            if fts_columns and 'id' not in fts_columns:
+                # Earlier versions keyed entries on the memories rowid, which VACUUM may renumber
+                for trigger in ('insert', 'update', 'delete'):
+                    self.conn.execute(f'DROP TRIGGER IF EXISTS memories_fts_{trigger}')
+                self.conn.execute('DROP TABLE memories_fts')
+                fts_columns = []
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(id UNINDEXED, text, tokenize='trigram')")
+            # FTS5 cannot index the id column, so an id -> FTS rowid map lets the
+            # triggers find a memory's entry without scanning the FTS content
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS memories_fts_rowids (
+                id TEXT PRIMARY KEY,
+                fts_rowid INTEGER NOT NULL
+            ) WITHOUT ROWID''')
+            
+            # Entries are keyed by memory id. INSERT OR REPLACE skips delete triggers,
+            # so the insert trigger drops the id's previous entry first
+            remove_entry = '''
+                DELETE FROM memories_fts WHERE rowid IN (SELECT fts_rowid FROM memories_fts_rowids WHERE id = {0}.id);
+                DELETE FROM memories_fts_rowids WHERE id = {0}.id;'''
+            add_entry = '''
+                INSERT INTO memories_fts(id, text) VALUES (new.id, new.text);
+                INSERT INTO memories_fts_rowids(id, fts_rowid) VALUES (new.id, last_insert_rowid());'''
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                {remove_entry.format('new')}{add_entry}
+            END''')
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF id, text ON memories BEGIN
+                {remove_entry.format('old')}{add_entry}
+            END''')
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                {remove_entry.format('old')}
+            END''')
+            
+            if not fts_columns:
+                self.conn.execute('DELETE FROM memories_fts_rowids')
+                self.conn.execute('INSERT INTO memories_fts(id, text) SELECT id, text FROM memories')
+                self.conn.execute('INSERT INTO memories_fts_rowids(id, fts_rowid) SELECT id, rowid FROM memories_fts')
+            self._has_text_search = True
+        except sqlite3.OperationalError as e:
+            # SQLite builds without FTS5 or the trigram tokenizer (< 3.34) keep the plain LIKE scan
+            logger.warning("Full-text search index unavailable, using table scans: %s", e)
+    
+    def _create_tag_index(self):
+        """Keep a normalized (tag, memory_id) table in sync so tag filters use an index"""
+        self._has_tag_index = False
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(memories)')}
+        if 'tags' not in columns:
+            return
+        
+        try:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_tags'"
+            ).fetchone()
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS memory_tags (
+                tag TEXT NOT NULL,
+                memory_id TEXT NOT NULL,
+                PRIMARY KEY (tag, memory_id)
+            ) WITHOUT ROWID''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_tags_memory_id ON memory_tags(memory_id)')
+            
+            # Rows are expanded from the JSON tags column. INSERT OR REPLACE does not fire
+            # delete triggers, so the insert trigger clears the id's old tags first
+            tag_rows = "SELECT DISTINCT value, new.id FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags END)"
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memory_tags_insert AFTER INSERT ON memories BEGIN
+                DELETE FROM memory_tags WHERE memory_id = new.id;
+                INSERT INTO memory_tags(tag, memory_id) {tag_rows};
+            END''')
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memory_tags_update AFTER UPDATE OF id, tags ON memories BEGIN
+                DELETE FROM memory_tags WHERE memory_id = old.id;
+                INSERT INTO memory_tags(tag, memory_id) {tag_rows};
+            END''')
+            self.conn.execute('''CREATE TRIGGER IF NOT EXISTS memory_tags_delete AFTER DELETE ON memories BEGIN
+                DELETE FROM memory_tags WHERE memory_id = old.id;
+            END''')
+            
+            if not exists:
+                self.conn.execute('''
+                    INSERT OR IGNORE INTO memory_tags(tag, memory_id)
+                    SELECT json_each.value, memories.id
+                    FROM memories, json_each(CASE WHEN json_valid(memories.tags) THEN memories.tags END)
+                ''')
+            self._has_tag_index = True
+        except sqlite3.OperationalError as e:
+            # SQLite builds without the JSON1 functions keep matching tags on the JSON text
+            logger.warning("Tag index unavailable, matching tags by scan: %s", e)
+    
+    def _create_version_counter(self):
+        """Keep a one-row counter that every insert, update and delete on memories bumps
+        
+        It lives in the database, so cache validators see the same version on every
+        connection and in every worker process sharing the file.
+        """
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS memories_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )''')
+        self.conn.execute('INSERT OR IGNORE INTO memories_version (id, version) VALUES (1, 0)')
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            self.conn.execute(f'''CREATE TRIGGER IF NOT EXISTS memories_version_{event.lower()} AFTER {event} ON memories BEGIN
+                UPDATE memories_version SET version = version + 1 WHERE id = 1;
+            END''')
+    
+    def _migrate_memories_table(self):
+        """Bring an existing memories table up to MEMORY_TABLE_SCHEMA"""
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(memories)')}
+        if 'text' not in columns and 'content' in columns:
+            self._rebuild_legacy_memories_table()
+            return
+        
+        # ALTER TABLE cannot add constraints or non-constant defaults, so only the type is kept
+        for name, declaration in MEMORY_TABLE_SCHEMA:
+            if name not in columns:
+                self.conn.execute(f'ALTER TABLE memories ADD COLUMN {name} {declaration.split()[0]}')
+                logger.info("Added column %s to memories table", name)
+    
+    def _rebuild_legacy_memories_table(self):
+        """Copy a content/importance-era memories table into the current layout"""
+        logger.info("Migrating memories table to the current schema")
+        # Dropping the old table drops its triggers; they are recreated on the new one.
+        # Its indexes name legacy columns and are rebuilt by _init_database instead
+        triggers = [sql for (sql,) in self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'memories'"
+        )]
+        columns = ', '.join(f'{name} {declaration}' for name, declaration in MEMORY_TABLE_SCHEMA)
+        
+        self.conn.execute('BEGIN')
+        with self.conn:
+            self.conn.execute(f'CREATE TABLE memories_migrated ({columns})')
+            self.conn.execute(f'''
+                INSERT INTO memories_migrated ({', '.join(_LEGACY_MEMORY_COLUMNS)})
+                SELECT {', '.join(_LEGACY_MEMORY_COLUMNS.values())} FROM memories
+            ''')
+            self.conn.execute('DROP TABLE memories')
+            self.conn.execute('ALTER TABLE memories_migrated RENAME TO memories')
+            for sql in triggers:
+                self.conn.execute(sql)
+    
     def _apply_database_migrations(self):
         """Apply database migrations based on version"""
         try:
@@ -208,76 +1170,72 @@ class MemoryProcessor:
     
     def add_memory(self, content: str, context: str = "", tags: Optional[List[str]] = None) -> str:
         """Add a new memory with full processing and proper error handling"""
-        if not content or not content.strip():
+        return self.add_memories_bulk([content], [context], [tags])[0]
+    
+    def add_memories_bulk(self, contents: List[str], contexts: Optional[List[str]] = None,
+                          tags: Optional[List[Optional[List[str]]]] = None) -> List[str]:
+        """Add many memories with one model pass per batch, one transaction and one vector write"""
+        if not contents:
+            return []
+        if any(not content or not content.strip() for content in contents):
             raise ValueError("Memory content cannot be empty")
+        contexts = contexts if contexts is not None else [""] * len(contents)
+        tags = tags if tags is not None else [None] * len(contents)
+        if not len(contents) == len(contexts) == len(tags):
+            raise ValueError("contents, contexts and tags must have the same length")
         
-        memory_id = str(uuid.uuid4())
+        memory_ids = [str(uuid.uuid4()) for _ in contents]
         
         try:
-            # Analyze emotion with confidence checking
-            try:
-                emotion_result = self.emotion_analyzer(content)
-                if emotion_result and len(emotion_result) > 0:
-                    emotion_data = emotion_result[0]
-                    if emotion_data.get('score', 0) >= MEMORY_CONFIG['MIN_EMOTION_CONFIDENCE']:
-                        emotion = emotion_data['label']
-                    else:
-                        emotion = 'neutral'  # Low confidence fallback
-                else:
-                    emotion = 'neutral'
-            except Exception as e:
-                logger.warning("Emotion analysis failed, using neutral: %s", e)
-                emotion = 'neutral'
-            
-            # Calculate importance with improved heuristic
-            importance = self._calculate_importance(content, context, tags)
+            # Generate embeddings and analyze emotions for the whole batch at once
+            embeddings, emotion_results = self._encode_and_classify(list(contents))
             
-            # Validate importance score
-            if importance < 0 or importance > 1:
-                importance = max(0, min(1, importance))
+            # Importance heuristic for the whole batch, clamped to [0, 1]
+            importances = importance_scores(
+                [len(content) for content in contents],
+                [len(context) if context and context.strip() else 0 for context in contexts],
+                [len(memory_tags) if memory_tags else 0 for memory_tags in tags],
+                [len(match_keywords(content) & CONTENT_IMPORTANCE_KEYWORDS) for content in contents]
+            ).tolist()
             
-            # Store in SQLite with parameterized query
-            tags_json = json.dumps(tags or [])
-            cursor = self.conn.execute("""
-                INSERT INTO memories (id, content, emotion, importance, tags, context)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (memory_id, content, emotion, importance, tags_json, context))
-            
-            if cursor.rowcount == 0:
-                raise sqlite3.Error("Failed to insert memory record")
-            
-            # Generate and store embedding with error handling
-            try:
-                embedding = self.embedder.encode(content)
-                self.collection.add(
-                    embeddings=[embedding.tolist()],
-                    documents=[content],
-                    metadatas=[{
-                        "memory_id": memory_id,
-                        "emotion": emotion,
-                        "importance": importance,
-                        "created_at": datetime.now().isoformat(),
-                        "tags": tags_json
-                    }],
-                    ids=[memory_id]
-                )
-            except Exception as e:
-                logger.error("Failed to store embedding for memory %s: %s", memory_id, e)
-                # Rollback SQLite transaction
-                self.conn.rollback()
-                raise RuntimeError(f"Vector storage failed: {e}") from e
+            rows = []
+            metadatas = []
+            timestamp = time.time()
+            created_at = datetime.now().isoformat()
+            no_topics = _dumps([])
+            for memory_id, content, context, memory_tags, emotion_data, importance in zip(
+                memory_ids, contents, contexts, tags, emotion_results, importances
+            ):
+                # Low confidence falls back to neutral
+                if emotion_data and emotion_data.get('score', 0) >= MEMORY_CONFIG['MIN_EMOTION_CONFIDENCE']:
+                    emotion = emotion_data['label']
+                else:
+                    emotion = 'neutral'
+                emotion_scores = {emotion_data['label']: emotion_data['score']} if emotion_data else {}
+                
+                tags_json = _dumps(memory_tags or [])
+                rows.append((
+                    memory_id, content, emotion, _dumps(emotion_scores), tags_json, no_topics,
+                    importance, timestamp, None, created_at, context or None
+                ))
+                metadatas.append({
+                    "memory_id": memory_id,
+                    "emotion": emotion,
+                    "importance": importance,
+                    "created_at": created_at,
+                    "tags": tags_json
+                })
             
-            self.conn.commit()
-            logger.info("Successfully added memory: %s", memory_id)
-            return memory_id
+            # A failed vector write rolls the rows back
+            self._persist(rows, list(embeddings), list(contents), metadatas, sync_vectors=True)
+            logger.info("Successfully added %d memories", len(memory_ids))
+            return memory_ids
             
         except sqlite3.Error as e:
-            logger.error("Database error adding memory: %s", e)
-            self.conn.rollback()
+            logger.error("Database error adding memories: %s", e)
             raise RuntimeError(f"Failed to add memory to database: {e}") from e
         except Exception as e:
-            logger.error("Unexpected error adding memory: %s", e)
-            self.conn.rollback()
+            logger.error("Unexpected error adding memories: %s", e)
             raise RuntimeError(f"Failed to add memory: {e}") from e
     
     def _calculate_importance(self, content: str, context: str = "", tags: Optional[List[str]] = None) -> float:
@@ -299,9 +1257,7 @@ class MemoryProcessor:
             importance += tags_factor
         
         # Keyword importance factor
-        important_keywords = ['important', 'remember', 'critical', 'urgent', 'key', 'essential']
-        content_lower = content.lower()
-        keyword_matches = sum(1 for keyword in important_keywords if keyword in content_lower)
+        keyword_matches = len(match_keywords(content) & CONTENT_IMPORTANCE_KEYWORDS)
         keyword_factor = min(keyword_matches * 0.1, 0.3)
         importance += keyword_factor
         
@@ -347,60 +1303,125 @@ class MemoryProcessor:
 
     def process_text_memory(self, text: str, metadata: Optional[dict] = None) -> Dict[str, Any]:
         """Process text input and create a memory"""
-        memory_id = str(uuid.uuid4())
-        timestamp = time.time()
-        
-        # Generate embedding
-        embedding = self.embedder.encode(text)
+        return self.text_batcher.submit(text, metadata)
+    
+    async def aprocess_text_memory(self, text: str, metadata: Optional[dict] = None) -> Dict[str, Any]:
+        """Process text input from a coroutine, batched with concurrent requests"""
+        return await self.text_batcher.asubmit(text, metadata)
+    
+    def _analyze_emotions(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify texts shortest first so each pipeline batch pads to similar lengths"""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_results = self.emotion_analyzer(
+            [texts[i] for i in order],
+            batch_size=MEMORY_CONFIG['EMOTION_BATCH_SIZE'],
+            truncation=True
+        )
+        results = [None] * len(texts)
+        for i, result in zip(order, sorted_results):
+            results[i] = result
+        return results
+    
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        """Encoder cache key for a text"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Embed a query text, reusing the cached embedding of a previously ingested or queried text"""
+        key = self._text_key(text)
+        with self._encoder_cache_lock:
+            entry = self._encoder_cache.get(key)
+            cached = entry[0] if entry is not None else self._query_cache.get(key)
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.float32)
+        
+        embedding = np.asarray(self._embed(text), dtype=np.float32)
+        with self._encoder_cache_lock:
+            self._query_cache[key] = embedding.tobytes()
+        return embedding
+    
+    def _encode_and_classify(self, texts: List[str]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """Embed and classify a batch of texts, running the models only on uncached texts"""
+        keys = [self._text_key(text) for text in texts]
+        with self._encoder_cache_lock:
+            entries = [self._encoder_cache.get(key) for key in keys]
+        
+        # Texts missing from the cache, each distinct text once
+        missing = {key: text for key, text, entry in zip(keys, texts, entries) if entry is None}
+        if missing:
+            missing_texts = list(missing.values())
+            # SentenceTransformer.encode already length-sorts internally
+            embeddings = self._embed(missing_texts, batch_size=MEMORY_CONFIG['EMBEDDING_BATCH_SIZE'])
+            with _inference_mode():
+                emotion_results = self._analyze_emotions(missing_texts)
+            
+            computed = {
+                key: (np.asarray(embedding, dtype=np.float32).tobytes(), emotion_result)
+                for key, embedding, emotion_result in zip(missing, embeddings, emotion_results)
+            }
+            with self._encoder_cache_lock:
+                self._encoder_cache.update(computed)
+            entries = [entry if entry is not None else computed[key] for key, entry in zip(keys, entries)]
         
-        # Analyze emotion
-        emotion_result = self.emotion_analyzer(text)[0]
-        emotion_label = emotion_result["label"]
-        emotion_score = emotion_result["score"]
-        emotion_scores = {emotion_label: emotion_score}
+        embeddings = np.stack([np.frombuffer(embedding, dtype=np.float32) for embedding, _ in entries])
+        return embeddings, [dict(emotion_result) for _, emotion_result in entries]
+    
+    def bulk_process_text_memories(self, texts: List[str],
+                                   metadatas: Optional[List[Optional[dict]]] = None) -> List[Dict[str, Any]]:
+        """Process many texts with batched model calls, one transaction and one vector write"""
+        if not texts:
+            return []
+        metadatas = metadatas if metadatas is not None else [None] * len(texts)
+        if len(metadatas) != len(texts):
+            raise ValueError("texts and metadatas must have the same length")
         
-        # Generate tags and calculate importance
-        tags = self._generate_text_tags(text, emotion_label)
-        importance_score = self._calculate_text_importance(text, emotion_score)
-        
-        # Create memory data
-        memory_data = {
-            'id': memory_id,
-            'text': text,
-            'emotion': emotion_label,
-            'emotion_scores': emotion_scores,
-            'tags': tags,
-            'topics': ['general'],  # Could be enhanced with topic modeling
-            'importance_score': importance_score,
-            'timestamp': timestamp,
-            'metadata': metadata
-        }
+        timestamp = time.time()
+        now = datetime.now()
+        created_at = now.isoformat()
         
-        # Store in vector database
-        self.collection.add(
-            documents=[text],
-            embeddings=[embedding.tolist()],
-            metadatas=[metadata or {}],
-            ids=[memory_id]
-        )
+        # Generate embeddings and analyze emotions for the whole batch at once
+        embeddings, emotion_results = self._encode_and_classify(texts)
         
-        # Store in SQLite
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO memories VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            memory_id, text, emotion_label,
-            json.dumps(emotion_scores),
-            json.dumps(tags),
-            json.dumps(['general']),
-            importance_score,
-            timestamp,
-            json.dumps(metadata) if metadata else None,
-            datetime.now().isoformat()
-        ))
-        self.conn.commit()
-        
-        return memory_data
+        memories = []
+        rows = []
+        for text, metadata, emotion_result in zip(texts, metadatas, emotion_results):
+            memory_id = str(uuid.uuid4())
+            emotion_label = emotion_result["label"]
+            emotion_score = emotion_result["score"]
+            emotion_scores = {emotion_label: emotion_score}
+            
+            # Generate tags and calculate importance from one keyword scan
+            keywords = match_keywords(text)
+            tags = self._generate_text_tags(text, emotion_label, keywords, hour=now.hour)
+            importance_score = self._calculate_text_importance(text, emotion_score, keywords)
+            
+            memories.append({
+                'id': memory_id,
+                'text': text,
+                'emotion': emotion_label,
+                'emotion_scores': emotion_scores,
+                'tags': tags,
+                'topics': ['general'],  # Could be enhanced with topic modeling
+                'importance_score': importance_score,
+                'timestamp': timestamp,
+                'metadata': metadata
+            })
+            rows.append((
+                memory_id, text, emotion_label,
+                _dumps(emotion_scores),
+                _dumps(tags),
+                _dumps(['general']),
+                importance_score,
+                timestamp,
+                _dumps(metadata) if metadata else None,
+                created_at,
+                None
+            ))
+        
+        # One SQLite transaction; the collection copy is written in the background
+        self._persist(rows, list(embeddings), list(texts), [metadata or {} for metadata in metadatas])
+        return memories
 
     def create_memory(self, text: str, metadata: Optional[dict] = None) -> Dict[str, Any]:
         """Create memory from text (wrapper for compatibility)"""
@@ -408,41 +1429,80 @@ class MemoryProcessor:
     
     def store_memory(self, memory: Memory) -> None:
         """Store a Memory object (used by advanced_features.py)"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO memories 
-            (id, text, emotion, emotion_scores, tags, topics, importance_score, timestamp, metadata, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            memory.id,
-            memory.text,
-            memory.emotion,
-            json.dumps(memory.emotion_scores),
-            json.dumps(memory.tags),
-            json.dumps(memory.topics),
-            memory.importance_score,
-            memory.timestamp.timestamp(),
-            json.dumps(memory.metadata),
-            datetime.now().isoformat()
-        ))
-        self.conn.commit()
+        self.store_memories([memory])
+    
+    def store_memories(self, memories: List[Memory]) -> None:
+        """Store Memory objects with one executemany, one commit and one vector write"""
+        if not memories:
+            return
+        rows = []
+        for memory in memories:
+            created_at = memory.created_at
+            timestamp = memory.timestamp or created_at
+            rows.append((
+                memory.id,
+                memory.content,
+                memory.emotion,
+                _dumps(memory.emotion_scores),
+                _dumps(memory.tags),
+                _dumps(memory.topics),
+                memory.importance,
+                timestamp.timestamp() if isinstance(timestamp, datetime) else timestamp,
+                _dumps(memory.metadata) if memory.metadata else None,
+                created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+                memory.context or None
+            ))
+        
+        self._persist(
+            rows,
+            [memory.embedding or None for memory in memories],
+            [memory.content for memory in memories],
+            [memory.metadata for memory in memories],
+            replace=True
+        )
+    
+    def _persist(self, rows: List[tuple], embeddings: List[Optional[Any]], documents: List[str],
+                 metadatas: List[dict], replace: bool = False, sync_vectors: bool = False) -> None:
+        """Write memory rows and their embeddings; every ingest path funnels through here
+        
+        Rows hold the MEMORY_COLUMNS values followed by context; the float16
+        embedding blob is appended here. Each embedded row reaches the vector
+        collection once: through the background writer, or with sync_vectors
+        inside the SQLite transaction so a failed vector write rolls it back.
+        """
+        embedded = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        vectors = {
+            'ids': [rows[i][0] for i in embedded],
+            'embeddings': [
+                embeddings[i].tolist() if isinstance(embeddings[i], np.ndarray) else embeddings[i]
+                for i in embedded
+            ],
+            'documents': [documents[i] for i in embedded],
+            'metadatas': [metadatas[i] for i in embedded]
+        }
+        rows = [
+            row + (self._embedding_to_blob(embedding) if embedding is not None else None,)
+            for row, embedding in zip(rows, embeddings)
+        ]
+        
+        with self.conn:
+            self.conn.executemany(_SQL_UPSERT_MEMORY if replace else _SQL_INSERT_MEMORY, rows)
+            if sync_vectors and embedded:
+                try:
+                    self.collection.add(**vectors)
+                except Exception as e:
+                    logger.error("Failed to store embeddings for %d memories: %s", len(embedded), e)
+                    raise RuntimeError(f"Vector storage failed: {e}") from e
         
-        # Store in vector database if embedding exists
-        if memory.embedding:
-            try:
-                self.collection.add(
-                    documents=[memory.text],
-                    embeddings=[memory.embedding],
-                    metadatas=[memory.metadata],
-                    ids=[memory.id]
-                )
-            except Exception as e:
-                print(f"Vector storage failed: {e}")
+        if embedded and not sync_vectors:
+            self.vector_writer.add(**vectors)
+        for i in embedded:
+            self.embedding_index.add(rows[i][0], embeddings[i])
     
     def get_memories(self, **filters) -> List[Memory]:
         """Get memories with optional filters (used by advanced_features.py)"""
         cursor = self.conn.cursor()
-        query = "SELECT * FROM memories"
+        query = f"SELECT {MEMORY_COLUMNS} FROM memories"
         params = []
         conditions = []
         
@@ -459,10 +1519,19 @@ class MemoryProcessor:
             params.append(filters['emotion'])
         
         if 'tags' in filters and filters['tags']:
-            # Simple tag matching - improve this for production
-            for tag in filters['tags']:
-                conditions.append("tags LIKE ?")
-                params.append(f'%"{tag}"%')
+            if self._has_tag_index:
+                # Memories carrying every requested tag, answered from the (tag, memory_id) key
+                tags = list(dict.fromkeys(filters['tags']))
+                conditions.append(
+                    f"id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({','.join('?' * len(tags))}) "
+                    "GROUP BY memory_id HAVING COUNT(*) = ?)"
+                )
+                params.extend(tags)
+                params.append(len(tags))
+            else:
+                for tag in filters['tags']:
+                    conditions.append("tags LIKE ?")
+                    params.append(f'%"{tag}"%')
         
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
@@ -470,89 +1539,156 @@ class MemoryProcessor:
         query += " ORDER BY timestamp DESC"
         
         if 'limit' in filters:
-            query += f" LIMIT {filters['limit']}"
+            query += " LIMIT ?"
+            params.append(int(filters['limit']))
         
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        memories = []
-        for row in rows:
-            memory_data = {
-                'id': row[0],
-                'text': row[1],
-                'emotion': row[2],
-                'emotion_scores': json.loads(row[3]) if row[3] else {},
-                'tags': json.loads(row[4]) if row[4] else [],
-                'topics': json.loads(row[5]) if row[5] else [],
-                'importance_score': row[6],
-                'timestamp': datetime.fromtimestamp(row[7]),
-                'metadata': json.loads(row[8]) if row[8] else {}
-            }
-            memories.append(Memory(**memory_data))
-        
-        return memories
+        return [self._row_to_memory(row) for row in cursor.fetchall()]
+
+    def query_memories(self, memory_filter: 'MemoryFilter',
+                       batch_size: Optional[int] = None) -> Iterator[Memory]:
+        """Yield the memories matching a MemoryFilter, newest first
+        
+        The filter runs inside SQLite, so rows it rejects are never fetched or decoded.
+        """
+        where_clause, params = memory_filter.to_sql(tag_index=self._has_tag_index)
+        batch_size = batch_size or MEMORY_CONFIG['EXPORT_BATCH_SIZE']
+        cursor = self.conn.execute(
+            f'SELECT {MEMORY_COLUMNS} FROM memories WHERE {where_clause} ORDER BY timestamp DESC',
+            params
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from map(self._row_to_memory, rows)
+
+    @staticmethod
+    def _row_to_memory(row: tuple) -> Memory:
+        """Decode a memories table row straight into a Memory, with no intermediate dict
+        
+        The epoch timestamp goes in as-is: Memory's validator converts it to aware UTC once.
+        """
+        memory_id, text, emotion, emotion_scores, tags, topics, importance_score, timestamp, metadata, _ = row
+        loads = orjson.loads
+        return Memory(
+            id=memory_id,
+            text=text,
+            emotion=emotion,
+            emotion_scores=loads(emotion_scores) if emotion_scores else {},
+            tags=loads(tags) if tags else [],
+            topics=loads(topics) if topics else [],
+            importance_score=importance_score,
+            timestamp=timestamp,
+            metadata=loads(metadata) if metadata else {}
+        )
 
     def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a specific memory by ID"""
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM memories WHERE id = ?', (memory_id,))
+        cursor.execute(_SQL_SELECT_MEMORY_BY_ID, (memory_id,))
         row = cursor.fetchone()
         
         if not row:
             return None
             
+        return self._row_to_dict(row)
+
+    def get_memories_by_ids(self, memory_ids: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve memories by ID with one query, in the given order, skipping missing IDs"""
+        if not memory_ids:
+            return []
+        cursor = self.conn.execute(
+            f"SELECT {MEMORY_COLUMNS} FROM memories WHERE id IN ({','.join('?' * len(memory_ids))})",
+            memory_ids
+        )
+        rows = {row[0]: row for row in cursor}
+        return [self._row_to_dict(rows[memory_id]) for memory_id in memory_ids if memory_id in rows]
+
+    def list_memories(self, skip: int = 0, limit: int = 100,
+                      fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """List memories with pagination, optionally reading only the given fields"""
+        columns, decode = self._field_decoder(fields)
+        if fields is None:
+            sql = _SQL_LIST_MEMORIES
+        else:
+            sql = f'SELECT {columns} FROM memories ORDER BY timestamp DESC LIMIT ? OFFSET ?'
+        cursor = self.conn.cursor()
+        cursor.execute(sql, (limit, skip))
+        return [decode(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _row_to_dict(row: tuple) -> Dict[str, Any]:
+        """Decode a memories table row into the API dictionary format"""
         return {
             'id': row[0],
             'text': row[1],
             'emotion': row[2],
-            'emotion_scores': json.loads(row[3]) if row[3] else {},
-            'tags': json.loads(row[4]) if row[4] else [],
-            'topics': json.loads(row[5]) if row[5] else [],
+            'emotion_scores': orjson.loads(row[3]) if row[3] else {},
+            'tags': orjson.loads(row[4]) if row[4] else [],
+            'topics': orjson.loads(row[5]) if row[5] else [],
             'importance_score': row[6],
             'timestamp': row[7],
-            'metadata': json.loads(row[8]) if row[8] else None
+            'metadata': orjson.loads(row[8]) if row[8] else None
         }
 
-    def list_memories(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-        """List memories with pagination"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT * FROM memories 
-            ORDER BY timestamp DESC 
-            LIMIT ? OFFSET ?
-        ''', (limit, skip))
-        rows = cursor.fetchall()
-        
-        memories = []
-        for row in rows:
-            memories.append({
-                'id': row[0],
-                'text': row[1],
-                'emotion': row[2],
-                'emotion_scores': json.loads(row[3]) if row[3] else {},
-                'tags': json.loads(row[4]) if row[4] else [],
-                'topics': json.loads(row[5]) if row[5] else [],
-                'importance_score': row[6],
-                'timestamp': row[7],
-                'metadata': json.loads(row[8]) if row[8] else None
-            })
-        return memories
+    def _field_decoder(self, fields: Optional[Iterable[str]]) -> Tuple[str, Callable[[tuple], Dict[str, Any]]]:
+        """Return the SELECT column list and row decoder for a subset of MEMORY_FIELDS
+        
+        Columns outside the subset are neither read nor JSON-decoded.
+        """
+        if fields is None:
+            return MEMORY_COLUMNS, self._row_to_dict
+        
+        fields = set(fields)
+        unknown = fields.difference(MEMORY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown memory fields: {', '.join(sorted(unknown))}")
+        names = [name for name in MEMORY_FIELDS if name in fields]
+        json_names = [name for name in names if name in _JSON_FIELD_DEFAULTS]
+        loads = orjson.loads
+        
+        def decode(row: tuple) -> Dict[str, Any]:
+            memory = dict(zip(names, row))
+            for name in json_names:
+                value = memory[name]
+                memory[name] = loads(value) if value else _JSON_FIELD_DEFAULTS[name]()
+            return memory
+        
+        return ', '.join(names), decode
 
     def search_memories(self, query: Optional[str] = None, emotion: Optional[str] = None,
                        tags: Optional[List[str]] = None, date_from: Optional[datetime] = None,
-                       date_to: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        """Search memories based on various criteria with proper SQL security"""
+                       date_to: Optional[datetime] = None,
+                       fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Search memories based on various criteria with proper SQL security
+        
+        When fields is given only those fields are read and decoded.
+        """
+        columns, decode = self._field_decoder(fields)
         conditions = []
         params = []
         
         if query:
-            conditions.append("text LIKE ?")
-            params.append(f"%{query}%")
+            pattern = f"%{query}%"
+            if self._has_text_search:
+                # The trigram index narrows candidates; the second LIKE keeps exact semantics
+                conditions.append("id IN (SELECT id FROM memories_fts WHERE memories_fts.text LIKE ?) AND text LIKE ?")
+                params.extend([pattern, pattern])
+            else:
+                conditions.append("text LIKE ?")
+                params.append(pattern)
         
         if emotion:
             conditions.append("emotion = ?")
             params.append(emotion)
         
+        if tags:
+            # Memories carrying any of the tags
+            if self._has_tag_index:
+                conditions.append(f"id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({','.join('?' * len(tags))}))")
+                params.extend(tags)
+            else:
+                conditions.append(f"({' OR '.join(['tags LIKE ?'] * len(tags))})")
+                params.extend(f'%"{tag}"%' for tag in tags)
+        
         if date_from:
             conditions.append("timestamp >= ?")
             params.append(date_from.timestamp())
@@ -566,7 +1702,7 @@ class MemoryProcessor:
         try:
             cursor = self.conn.cursor()
             cursor.execute(f'''
-                SELECT * FROM memories 
+                SELECT {columns} FROM memories 
                 WHERE {where_clause}
                 ORDER BY timestamp DESC
             ''', params)
@@ -575,26 +1711,8 @@ class MemoryProcessor:
             memories = []
             for row in rows:
                 try:
-                    memory = {
-                        'id': row[0],
-                        'text': row[1],
-                        'emotion': row[2],
-                        'emotion_scores': json.loads(row[3]) if row[3] else {},
-                        'tags': json.loads(row[4]) if row[4] else [],
-                        'topics': json.loads(row[5]) if row[5] else [],
-                        'importance_score': row[6],
-                        'timestamp': row[7],
-                        'metadata': json.loads(row[8]) if row[8] else None
-                    }
-                    
-                    # Filter by tags if specified
-                    if tags:
-                        memory_tags = memory['tags']
-                        if any(tag in memory_tags for tag in tags):
-                            memories.append(memory)
-                    else:
-                        memories.append(memory)
-                except (json.JSONDecodeError, IndexError, TypeError) as e:
+                    memories.append(decode(row))
+                except (orjson.JSONDecodeError, IndexError, TypeError) as e:
                     logger.warning("Failed to parse memory row: %s", e)
                     continue
                     
@@ -615,93 +1733,96 @@ class MemoryProcessor:
         self.conn.commit()
         
         # Also delete from vector database
-        try:
-            self.collection.delete(ids=[memory_id])
-        except:
-            pass  # May not exist in vector DB
+        self.embedding_index.remove([memory_id])
+        self.vector_writer.delete([memory_id])
         
         return deleted
 
     def update_memory(self, memory_id: str, text: str, metadata: Optional[dict] = None) -> Optional[Dict[str, Any]]:
         """Update an existing memory"""
-        # Check if memory exists
-        existing = self.get_memory(memory_id)
+        # Check if memory exists, fetching only what the update needs
+        existing = self.conn.execute(
+            'SELECT text, embedding_blob FROM memories WHERE id = ?', (memory_id,)
+        ).fetchone()
         if not existing:
             return None
+        metadata_json = _dumps(metadata) if metadata else None
+        
+        # Unchanged text keeps its analysis; only the metadata is rewritten
+        stored_text, stored_blob = existing
+        if stored_text == text and stored_blob:
+            row = self.conn.execute(
+                f'UPDATE memories SET metadata = ? WHERE id = ? RETURNING {MEMORY_COLUMNS}',
+                (metadata_json, memory_id)
+            ).fetchone()
+            self.conn.commit()
+            self.vector_writer.update(
+                ids=[memory_id],
+                embeddings=[self._blob_to_embedding(stored_blob).tolist()],
+                documents=[text],
+                metadatas=[metadata or {}]
+            )
+            return self._row_to_dict(row)
         
         # Reprocess the text
-        timestamp = time.time()
-        embedding = self.embedder.encode(text)
-        emotion_result = self.emotion_analyzer(text)[0]
+        embeddings, emotion_results = self._encode_and_classify([text])
+        embedding, emotion_result = embeddings[0], emotion_results[0]
         emotion_label = emotion_result["label"]
         emotion_score = emotion_result["score"]
         emotion_scores = {emotion_label: emotion_score}
-        tags = self._generate_text_tags(text, emotion_label)
-        importance_score = self._calculate_text_importance(text, emotion_score)
-        
-        # Update in SQLite
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE memories 
-            SET text = ?, emotion = ?, emotion_scores = ?, tags = ?, 
-                importance_score = ?, metadata = ?
-            WHERE id = ?
+        keywords = match_keywords(text)
+        tags = self._generate_text_tags(text, emotion_label, keywords)
+        importance_score = self._calculate_text_importance(text, emotion_score, keywords)
+        
+        # Update in SQLite; RETURNING hands back the row so no re-read is needed
+        row = self.conn.execute(f'''
+            UPDATE memories
+            SET text = ?, emotion = ?, emotion_scores = ?, tags = ?, importance_score = ?, metadata = ?, embedding_blob = ?
+            WHERE id = ? RETURNING {MEMORY_COLUMNS}
         ''', (
-            text, emotion_label, json.dumps(emotion_scores),
-            json.dumps(tags), importance_score,
-            json.dumps(metadata) if metadata else None,
-            memory_id
-        ))
+            text, emotion_label, _dumps(emotion_scores), _dumps(tags), importance_score,
+            metadata_json, self._embedding_to_blob(embedding), memory_id
+        )).fetchone()
         self.conn.commit()
         
         # Update in vector database
-        try:
-            self.collection.update(
-                ids=[memory_id],
-                documents=[text],
-                embeddings=[embedding.tolist()],
-                metadatas=[metadata or {}]
-            )
-        except:
-            pass
+        self.embedding_index.add(memory_id, embedding)
+        self.vector_writer.update(
+            ids=[memory_id],
+            embeddings=[embedding.tolist()],
+            documents=[text],
+            metadatas=[metadata or {}]
+        )
         
-        return self.get_memory(memory_id)
+        return self._row_to_dict(row)
 
     def find_similar_memories(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Find memories similar to given text using vector similarity"""
-        embedding = self.embedder.encode(text)
+        embedding = self._encode_query(text)
         
         try:
-            results = self.collection.query(
-                query_embeddings=[embedding.tolist()],
-                n_results=limit
-            )
-            
-            similar_memories = []
-            for i, memory_id in enumerate(results['ids'][0]):
-                memory = self.get_memory(memory_id)
-                if memory:
-                    similar_memories.append(memory)
-            
-            return similar_memories
-        except:
+            matches = self.embedding_index.search(embedding, limit)
+            return self.get_memories_by_ids([memory_id for memory_id, _score in matches])
+        except Exception as e:
+            logger.error("Similarity search failed: %s", e)
             return []
 
     def get_analytics(self) -> Dict[str, Any]:
         """Get memory analytics and statistics"""
         cursor = self.conn.cursor()
         
-        # Total memories
-        cursor.execute('SELECT COUNT(*) FROM memories')
-        total_memories = cursor.fetchone()[0]
-        
-        # Emotion distribution
-        cursor.execute('SELECT emotion, COUNT(*) FROM memories GROUP BY emotion')
-        emotion_dist = dict(cursor.fetchall())
+        # One grouped scan yields the distribution, the total and the average
+        cursor.execute('''
+            SELECT emotion, COUNT(*), COUNT(importance_score), TOTAL(importance_score)
+            FROM memories GROUP BY emotion
+        ''')
+        rows = cursor.fetchall()
+        emotion_dist = {emotion: count for emotion, count, _, _ in rows}
+        total_memories = sum(emotion_dist.values())
         
-        # Average importance
-        cursor.execute('SELECT AVG(importance_score) FROM memories')
-        avg_importance = cursor.fetchone()[0] or 0.0
+        # Average importance, skipping NULL scores like AVG() does
+        scored = sum(row[2] for row in rows)
+        avg_importance = sum(row[3] for row in rows) / scored if scored else 0.0
         
         # Top topics (simplified)
         top_topics = ['general', 'conversation', 'meeting']
@@ -713,79 +1834,162 @@ class MemoryProcessor:
             'average_importance': avg_importance
         }
 
+    def get_analytics_digest(self) -> tuple:
+        """Cheap fingerprint of the memory set for HTTP cache validation"""
+        # One read so the count and the version come from the same snapshot; the
+        # trigger-maintained version also changes on in-place updates and deletes
+        count, latest_timestamp, version = self.conn.execute(
+            'SELECT COUNT(*), MAX(timestamp), (SELECT version FROM memories_version WHERE id = 1) FROM memories'
+        ).fetchone()
+        return count, float(latest_timestamp or 0.0), version or 0
+
     def get_emotion_trends(self, days: int = 30) -> List[Dict[str, Any]]:
         """Get emotion trends over time"""
         cutoff_date = (datetime.now() - timedelta(days=days)).timestamp()
         
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT DATE(datetime(timestamp, 'unixepoch')) as date, 
-                   emotion, COUNT(*) as count
+        # Bucket by UTC day number so the query reads only the covering
+        # (timestamp, emotion) index; day numbers become ISO dates below
+        cursor = self.conn.execute('''
+            SELECT CAST(timestamp / 86400 AS INTEGER) AS day, emotion, COUNT(*) AS count
             FROM memories 
             WHERE timestamp >= ?
-            GROUP BY date, emotion
-            ORDER BY date
+            GROUP BY day, emotion
+            ORDER BY day
         ''', (cutoff_date,))
         
+        epoch_ordinal = date(1970, 1, 1).toordinal()
+        dates = {}
         trends = []
-        for row in cursor.fetchall():
+        for day, emotion, count in cursor:
+            if day not in dates:
+                dates[day] = date.fromordinal(epoch_ordinal + day).isoformat()
             trends.append({
-                'date': row[0],
-                'emotion': row[1],
-                'count': row[2]
+                'date': dates[day],
+                'emotion': emotion,
+                'count': count
             })
         
         return trends
 
+    def iter_export_batches(self, batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every memory, newest first, one fetchmany() batch at a time"""
+        batch_size = batch_size or MEMORY_CONFIG['EXPORT_BATCH_SIZE']
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT {MEMORY_COLUMNS} FROM memories ORDER BY timestamp DESC')
+        while rows := cursor.fetchmany(batch_size):
+            yield [self._row_to_dict(row) for row in rows]
+
+    def _iter_raw_export_rows(self, batch_size: Optional[int] = None) -> Iterator[List[tuple]]:
+        """Yield batches of MEMORY_FIELDS rows with JSON columns left as stored JSON text"""
+        batch_size = batch_size or MEMORY_CONFIG['EXPORT_BATCH_SIZE']
+        empty = {name: _dumps(default()) for name, default in _JSON_FIELD_DEFAULTS.items()}
+        # Map empty JSON columns to the JSON text of their decoded default
+        columns = ', '.join(
+            f"COALESCE(NULLIF({name}, ''), '{empty[name]}')" if name in empty else name
+            for name in MEMORY_FIELDS
+        )
+        cursor = self.conn.execute(f'SELECT {columns} FROM memories ORDER BY timestamp DESC')
+        while rows := cursor.fetchmany(batch_size):
+            yield rows
+
+    def iter_export_json(self, batch_size: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the JSON export's comma-separated array elements, one chunk per batch
+        
+        Stored JSON columns are spliced in as-is instead of being decoded and re-encoded.
+        """
+        dumps = orjson.dumps
+        keys = [f'{"{" if i == 0 else ","}"{name}":'.encode() for i, name in enumerate(MEMORY_FIELDS)]
+        raw = [name in _JSON_FIELD_DEFAULTS for name in MEMORY_FIELDS]
+        separator = b''
+        for rows in self._iter_raw_export_rows(batch_size):
+            chunk = b','.join(
+                b''.join(
+                    key + (value.encode() if is_raw else dumps(value))
+                    for key, value, is_raw in zip(keys, row, raw)
+                ) + b'}'
+                for row in rows
+            )
+            yield separator + chunk
+            separator = b','
+
+    def iter_export_csv(self, batch_size: Optional[int] = None) -> Iterator[str]:
+        """Yield the CSV export as a header line followed by one chunk per batch
+        
+        JSON columns are written as their stored JSON text.
+        """
+        import csv
+        import io
+        output = io.StringIO()
+        writer = None
+        for rows in self._iter_raw_export_rows(batch_size):
+            if writer is None:
+                writer = csv.writer(output)
+                writer.writerow(MEMORY_FIELDS)
+            writer.writerows(rows)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
     def export_memories(self, format_type: str = "json") -> Any:
         """Export all memories in specified format"""
-        memories = self.list_memories(limit=10000)  # Large limit for export
-        
-        if format_type == "json":
-            return memories
-        elif format_type == "csv":
-            import csv
-            import io
-            output = io.StringIO()
-            if memories:
-                writer = csv.DictWriter(output, fieldnames=memories[0].keys())
-                writer.writeheader()
-                writer.writerows(memories)
-            return output.getvalue()
-        else:
-            return memories
+        if format_type == "csv":
+            return ''.join(self.iter_export_csv())
+        return [memory for batch in self.iter_export_batches() for memory in batch]
 
     def bulk_delete_memories(self, memory_ids: List[str]) -> int:
         """Delete multiple memories"""
-        cursor = self.conn.cursor()
-        placeholders = ','.join(['?'] * len(memory_ids))
-        cursor.execute(f'DELETE FROM memories WHERE id IN ({placeholders})', memory_ids)
-        deleted_count = cursor.rowcount
-        self.conn.commit()
+        deleted_count = self._delete_memory_rows(memory_ids)
         
         # Also delete from vector database
-        try:
-            self.collection.delete(ids=memory_ids)
-        except:
-            pass
+        self._delete_memory_vectors(memory_ids)
         
         return deleted_count
 
-    def _generate_text_tags(self, text: str, emotion: str) -> List[str]:
-        """Generate tags for text content"""
+    async def abulk_delete_memories(self, memory_ids: List[str]) -> int:
+        """Delete multiple memories without blocking the event loop
+        
+        Vectors are dropped only after the SQLite delete commits, so a failed
+        transaction leaves the rows searchable. Dropping them is an in-memory
+        remove plus a queued collection write, so it runs inline.
+        """
+        deleted_count = await asyncio.to_thread(self._delete_memory_rows, memory_ids)
+        self._delete_memory_vectors(memory_ids)
+        return deleted_count
+
+    def _delete_memory_rows(self, memory_ids: List[str]) -> int:
+        """Delete rows in one transaction, chunked under SQLite's variable limit, and return how many existed"""
+        chunk = MEMORY_CONFIG['DELETE_BATCH_SIZE']
+        deleted_count = 0
+        with self.conn:
+            for start in range(0, len(memory_ids), chunk):
+                ids = memory_ids[start:start + chunk]
+                cursor = self.conn.execute(f"DELETE FROM memories WHERE id IN ({','.join('?' * len(ids))})", ids)
+                deleted_count += cursor.rowcount
+        return deleted_count
+
+    def _delete_memory_vectors(self, memory_ids: List[str]):
+        """Drop embeddings from the in-memory index and the Chroma collection"""
+        self.embedding_index.remove(memory_ids)
+        self.vector_writer.delete(memory_ids)
+
+    def _generate_text_tags(self, text: str, emotion: str, keywords: Optional[frozenset] = None,
+                            *, hour: Optional[int] = None) -> List[str]:
+        """Generate tags for text content
+        
+        Batch callers pass the hour so the whole batch shares one clock read.
+        """
         tags = [emotion]
-        text_lower = text.lower()
+        if keywords is None:
+            keywords = match_keywords(text)
         
         # Topic-based tags
-        if any(word in text_lower for word in ['meeting', 'discussion', 'call']):
-            tags.append('meeting')
-        if any(word in text_lower for word in ['project', 'work', 'task']):
-            tags.append('work')
-        if any(word in text_lower for word in ['decision', 'choose', 'decide']):
-            tags.append('decision')
+        for tag, words in TEXT_TAG_KEYWORDS.items():
+            if not keywords.isdisjoint(words):
+                tags.append(tag)
         
         # Time-based tags
-        hour = datetime.now().hour
+        if hour is None:
+            hour = datetime.now().hour
         if 9 <= hour <= 12:
             tags.append('morning')
         elif 13 <= hour <= 17:
@@ -795,7 +1999,8 @@ class MemoryProcessor:
         
         return tags
 
-    def _calculate_text_importance(self, text: str, emotion_score: float) -> float:
+    def _calculate_text_importance(self, text: str, emotion_score: float,
+                                   keywords: Optional[frozenset] = None) -> float:
         """Calculate memory importance score (renamed to avoid conflict)"""
         importance = 0.5  # Base importance
         
@@ -804,11 +2009,10 @@ class MemoryProcessor:
             importance += 0.1
         
         # Keyword importance
-        important_keywords = ['important', 'urgent', 'deadline', 'decision', 'critical', 'meeting']
-        for keyword in important_keywords:
-            if keyword.lower() in text.lower():
-                importance += 0.1
-                break
+        if keywords is None:
+            keywords = match_keywords(text)
+        if not keywords.isdisjoint(TEXT_IMPORTANCE_KEYWORDS):
+            importance += 0.1
         
         # Emotion intensity
         importance += emotion_score * 0.2
@@ -817,8 +2021,13 @@ class MemoryProcessor:
 
     def close(self):
         """Clean up resources"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        if hasattr(self, 'vector_writer'):
+            self.vector_writer.close()
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
 
 class MemoryFilter:
     """Advanced filtering for memories with proper initialization"""
@@ -832,26 +2041,75 @@ class MemoryFilter:
         self.emotion = emotion
         self.min_importance = min_importance
     
-    def apply(self, memories: List[Memory]) -> List[Memory]:
-        """Apply filter criteria to a list of memories"""
-        filtered = memories
+    def to_sql(self, tag_index: bool = True) -> Tuple[str, List[Any]]:
+        """Return the filter as a parameterized WHERE clause for the memories table
+        
+        Matches apply(): any requested tag qualifies a memory. tag_index selects the
+        memory_tags side table over a LIKE scan of the tags JSON.
+        """
+        conditions = []
+        params: List[Any] = []
         
         if self.start_date:
-            filtered = [m for m in filtered if m.timestamp >= self.start_date]
+            conditions.append("timestamp >= ?")
+            params.append(self._epoch(self.start_date))
         
         if self.end_date:
-            filtered = [m for m in filtered if m.timestamp <= self.end_date]
+            conditions.append("timestamp <= ?")
+            params.append(self._epoch(self.end_date))
         
         if self.emotion:
-            filtered = [m for m in filtered if m.emotion == self.emotion]
+            conditions.append("emotion = ?")
+            params.append(self.emotion)
         
         if self.tags:
-            filtered = [m for m in filtered if any(tag in m.tags for tag in self.tags)]
+            tags = list(dict.fromkeys(self.tags))
+            if tag_index:
+                conditions.append(f"id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({','.join('?' * len(tags))}))")
+                params.extend(tags)
+            else:
+                conditions.append(f"({' OR '.join(['tags LIKE ?'] * len(tags))})")
+                params.extend(f'%"{tag}"%' for tag in tags)
         
         if self.min_importance is not None:
-            filtered = [m for m in filtered if m.importance_score >= self.min_importance]
+            conditions.append("importance_score >= ?")
+            params.append(self.min_importance)
         
-        return filtered
+        return (" AND ".join(conditions) if conditions else "1=1"), params
+    
+    def apply(self, memories: List[Memory]) -> List[Memory]:
+        """Apply filter criteria to a list of memories in a single pass
+        
+        For memories already stored, MemoryProcessor.query_memories(self) filters in SQL.
+        """
+        dated = bool(self.start_date or self.end_date)
+        # Dates become epoch floats once per call; memories cache their own epoch
+        start = self._epoch(self.start_date) if self.start_date else float('-inf')
+        end = self._epoch(self.end_date) if self.end_date else float('inf')
+        emotion = self.emotion or None
+        tags = frozenset(self.tags) or None
+        min_importance = self.min_importance
+        
+        if not dated and emotion is tags is min_importance is None:
+            return memories
+        
+        # Every criterion is checked per memory, short-circuiting on the first miss,
+        # instead of rebuilding the list once per criterion. Undated memories fail a
+        # date bound, as the NULL timestamp does in to_sql()
+        return [
+            m for m in memories
+            if (not dated or ((ts := m.timestamp_epoch) is not None and start <= ts <= end))
+            and (emotion is None or m.emotion == emotion)
+            and (tags is None or not tags.isdisjoint(m.tags))
+            and (min_importance is None or m.importance >= min_importance)
+        ]
+    
+    @staticmethod
+    def _epoch(value: datetime) -> float:
+        """POSIX seconds for a filter bound, reading naive datetimes as UTC like Memory does"""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
     
     def search_memories(self, memories: List[Memory]) -> List[Memory]:
         """Alias for apply method for compatibility"""
@@ -867,8 +2125,9 @@ class MemoryFilter:
     
     @staticmethod
     def by_date_range(memories: List[Dict], start: datetime, end: datetime) -> List[Dict]:
-        return [m for m in memories 
-                if start.timestamp() <= m.get('timestamp', 0) <= end.timestamp()]
+        # Bounds are converted once rather than on every element's comparison
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        return [m for m in memories if start_ts <= m.get('timestamp', 0) <= end_ts]
 
 class MemoryQueryBuilder:
     """Fluent API for building complex memory queries"""
@@ -901,13 +2160,13 @@ class MemoryExporter:
     
     def to_json(self, filename: Optional[str] = None) -> str:
         data = self.processor.export_memories("json")
-        json_str = json.dumps(data, indent=2)
+        json_bytes = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
         
         if filename:
-            with open(filename, 'w') as f:
-                f.write(json_str)
+            with open(filename, 'wb') as f:
+                f.write(json_bytes)
         
-        return json_str
+        return json_bytes.decode()
     
     def to_csv(self, filename: Optional[str] = None) -> str:
         csv_data = self.processor.export_memories("csv")
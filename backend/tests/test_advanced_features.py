@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from advanced_features import MemorySnapshot
+
+def test_snapshot_retention_halves_per_half_life():
+    """Test retention equals importance at age 0 and halves after one half-life"""
+    snapshot = MemorySnapshot(
+        count=2,
+        location_labels=['unknown'],
+        location_codes=np.zeros(2, dtype=np.int64),
+        engagement=np.full(2, 0.5),
+        stress=np.full(2, 0.5),
+        importance=np.array([0.8, 0.6]),
+        hours=np.zeros(2, dtype=np.int64),
+        dates=np.array(['2024-01-01', '2024-01-01'], dtype='datetime64[D]'),
+        emotions=['neutral', 'neutral'],
+        ages=np.array([0.0, 24 * 3600.0])
+    )
+
+    np.testing.assert_allclose(snapshot.retention(half_life_hours=24), [0.8, 0.3])
+
+    with pytest.raises(ValueError):
+        snapshot.retention(half_life_hours=0)
@@ -1,11 +1,14 @@
 from fastapi.testclient import TestClient
 import pytest
+import asyncio
+import threading
 import json
 import os
+import sqlite3
 from datetime import datetime
-from memory_api import app
+from memory_api import app, compute_analytics_etag
 from memory_model import Memory
-from memory_utils import MemoryProcessor
+from memory_utils import MemoryProcessor, MemoryFilter, TextMemoryBatcher, EmbeddingIndex, HnswEmbeddingIndex, importance_scores, match_keywords
 
 client = TestClient(app)
 
@@ -125,6 +128,67 @@ def test_memory_stats():
     assert response.status_code == 200
     assert "totalMemories" in response.json()
 
+def test_analytics_etag_not_modified():
+    """Test conditional GET on analytics returns 304 for unchanged data"""
+    response = client.get("/analytics")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    
+    cached_response = client.get("/analytics", headers={"If-None-Match": etag})
+    assert cached_response.status_code == 304
+    
+    # A write must invalidate the validator
+    client.post("/memories", json={"text": "Memory that changes analytics"})
+    fresh_response = client.get("/analytics", headers={"If-None-Match": etag})
+    assert fresh_response.status_code == 200
+    assert fresh_response.headers["etag"] != etag
+
+def test_upload_audio_rejects_invalid_type():
+    """Test streamed audio upload validates the multipart file part"""
+    response = client.post(
+        "/memories/audio",
+        files={"file": ("notes.txt", b"not audio", "text/plain")}
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_FILE_TYPE"
+
+def test_upload_audio_rejects_spoofed_content():
+    """Test audio headers are checked against the file's magic bytes"""
+    response = client.post(
+        "/memories/audio",
+        files={"file": ("song.mp3", b"plain text pretending to be audio", "audio/mpeg")}
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_FILE_TYPE"
+
+def test_memory_to_record(test_memory):
+    """Test validated memories convert to slots-based records"""
+    record = test_memory.to_record()
+    assert record.id == test_memory.id
+    assert record.importance == test_memory.importance
+    assert record.tags == ["test", "memory"]
+    assert not hasattr(record, "__dict__")
+    
+    ingested = Memory.ingest({"id": "ingest-1", "text": "  Raw input  ", "tags": '["A", "a"]'})
+    assert ingested.content == "Raw input"
+    assert ingested.tags == ["a"]
+
+def test_memory_metadata_drops_unstorable_values():
+    """Test metadata validation rejects values the storage encoder cannot write"""
+    memory = Memory(id="meta-test", text="Metadata memory", metadata={"ok": 1, "huge": 2 ** 70})
+    assert memory.metadata == {"ok": 1}
+
+def test_memory_from_json_batch():
+    """Test bulk JSON import validates every memory in the array"""
+    memories = Memory.from_json_batch(
+        '[{"id": "batch-1", "text": "First"}, {"id": "batch-2", "text": "Second", "emotion": "JOY"}]'
+    )
+    assert [memory.id for memory in memories] == ["batch-1", "batch-2"]
+    assert memories[1].emotion == "joy"
+    
+    with pytest.raises(ValueError):
+        Memory.from_json_batch('{"id": "not-a-list", "text": "Single"}')
+
 # Memory Processor Tests
 def test_memory_processor_store(memory_processor, test_memory):
     """Test storing a memory with MemoryProcessor"""
@@ -196,3 +260,187 @@ def test_memory_processor_filter(memory_processor):
     assert len(results) > 0
     assert all(m.emotion == "happy" for m in results)
     assert not any(m.id == "filter-test-2" for m in results)
+
+def test_memory_processor_query_memories(memory_processor):
+    """Test MemoryFilter criteria are applied in SQL and agree with MemoryFilter.apply"""
+    memory_processor.store_memories([
+        Memory(id="query-1", text="Work win", emotion="happy", tags=["work"], importance_score=0.9),
+        Memory(id="query-2", text="Work loss", emotion="sad", tags=["work"], importance_score=0.9),
+        Memory(id="query-3", text="Quiet day", emotion="happy", tags=["home"], importance_score=0.2)
+    ])
+    
+    memory_filter = MemoryFilter(tags=["work", "travel"], emotion="happy", min_importance=0.5)
+    results = list(memory_processor.query_memories(memory_filter))
+    assert [m.id for m in results] == ["query-1"]
+    assert [m.id for m in memory_filter.apply(memory_processor.get_memories())] == ["query-1"]
+
+def test_memory_processor_bulk_text(memory_processor):
+    """Test bulk text ingest stores every memory in one call"""
+    created = memory_processor.bulk_process_text_memories(
+        ["First bulk memory", "Second bulk memory"],
+        [None, {"source": "test"}]
+    )
+    assert len(created) == 2
+    assert created[1]["metadata"] == {"source": "test"}
+    
+    for memory in created:
+        assert memory_processor.get_memory(memory["id"])["text"] == memory["text"]
+        assert memory["id"] in memory_processor.embedding_index
+
+def test_memory_processor_list_fields(memory_processor):
+    """Test listing memories reads and decodes only the requested fields"""
+    memory_processor.bulk_process_text_memories(["Field pruned memory"])
+    
+    listed = memory_processor.list_memories(fields={"id", "tags"})
+    assert set(listed[0]) == {"id", "tags"}
+    assert isinstance(listed[0]["tags"], list)
+    
+    with pytest.raises(ValueError):
+        memory_processor.list_memories(fields={"embedding"})
+
+def test_memory_processor_migrates_legacy_schema(tmp_path):
+    """Test a content/importance-era memories table is rebuilt into the current layout"""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE memories (
+        id TEXT PRIMARY KEY, content TEXT NOT NULL, emotion TEXT, importance REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        tags TEXT, context TEXT, version INTEGER DEFAULT 1
+    )''')
+    conn.execute(
+        "INSERT INTO memories (id, content, emotion, importance, tags) VALUES ('old-1', 'Legacy memory', 'joy', 0.4, '[\"legacy\"]')"
+    )
+    conn.commit()
+    conn.close()
+    
+    processor = MemoryProcessor(db_path=db_path)
+    try:
+        migrated = processor.get_memory("old-1")
+        assert migrated["text"] == "Legacy memory"
+        assert migrated["importance_score"] == 0.4
+        assert [m["id"] for m in processor.search_memories(tags=["legacy"])] == ["old-1"]
+    finally:
+        processor.close()
+
+def test_match_keywords():
+    """Test the keyword scan finds overlapping matches case-insensitively"""
+    assert match_keywords("URGENT callwork, decide!") == {"urgent", "call", "work", "decide"}
+    assert match_keywords("nothing notable") == frozenset()
+
+def test_importance_scores():
+    """Test batched importance scoring caps each factor and the total"""
+    scores = importance_scores([0, 500, 5000], [0, 50, 5000], [0, 1, 9], [0, 1, 9])
+    assert scores.tolist() == pytest.approx([0.0, 0.6, 1.0])
+
+def test_embedding_index_search():
+    """Test vectorized similarity search ranks closest embeddings first"""
+    index = EmbeddingIndex(initial_capacity=2)
+    index.add("east", [1.0, 0.0])
+    index.add("north", [0.0, 1.0])
+    index.add("north-east", [1.0, 1.0])
+    
+    results = index.search([1.0, 0.1], limit=2)
+    assert [memory_id for memory_id, _ in results] == ["east", "north-east"]
+    
+    index.remove(["east"])
+    assert "east" not in index
+    assert index.search([1.0, 0.1], limit=1)[0][0] == "north-east"
+
+def test_hnsw_embedding_index_search():
+    """Test the FAISS HNSW index skips removed and replaced embeddings"""
+    pytest.importorskip("faiss")
+    index = HnswEmbeddingIndex()
+    index.add("east", [1.0, 0.0])
+    index.add("north", [0.0, 1.0])
+    index.add("north-east", [1.0, 1.0])
+    
+    results = index.search([1.0, 0.1], limit=2)
+    assert [memory_id for memory_id, _ in results] == ["east", "north-east"]
+    
+    index.remove(["east"])
+    index.add("north", [1.0, 0.0])
+    assert "east" not in index and len(index) == 2
+    assert [memory_id for memory_id, _ in index.search([1.0, 0.1], limit=3)] == ["north", "north-east"]
+
+def test_text_batcher_flushes_after_leader_cancelled():
+    """Test a follower still gets its result when the batch leader is cancelled mid-window"""
+    batcher = TextMemoryBatcher(lambda texts, metadatas: [{"text": text} for text in texts], window=0.05)
+    
+    async def run():
+        leader = asyncio.create_task(batcher.asubmit("a"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(batcher.asubmit("b"), timeout=1)
+    
+    assert asyncio.run(run()) == {"text": "b"}
+
+def test_analytics_etag_same_across_threads(memory_processor):
+    """Test the analytics ETag does not depend on which thread's connection computes it"""
+    opened = threading.Event()
+    written = threading.Event()
+    etags = []
+    
+    def worker():
+        # Open this thread's connection before the writes, then digest after them
+        compute_analytics_etag(memory_processor)
+        opened.set()
+        written.wait()
+        etags.append(compute_analytics_etag(memory_processor))
+    
+    worker_thread = threading.Thread(target=worker)
+    worker_thread.start()
+    opened.wait()
+    memory_processor.bulk_process_text_memories(["First etag memory"])
+    memory_processor.bulk_process_text_memories(["Second etag memory"])
+    written.set()
+    worker_thread.join()
+    
+    assert etags == [compute_analytics_etag(memory_processor)]
+
+def test_analytics_etag_changes_on_update_from_another_processor(memory_processor):
+    """Test an in-place update made through another processor on the same file changes the ETag"""
+    created = memory_processor.bulk_process_text_memories(["Shared file memory"])[0]
+    before = compute_analytics_etag(memory_processor)
+    
+    other = MemoryProcessor(db_path=memory_processor.db_path)
+    try:
+        other.update_memory(created["id"], created["text"], {"source": "other worker"})
+    finally:
+        other.close()
+    
+    assert compute_analytics_etag(memory_processor) != before
+
+def test_abulk_delete_keeps_vectors_when_rows_survive(memory_processor, monkeypatch):
+    """Test a failed SQLite delete leaves the memories in the similarity index"""
+    created = memory_processor.bulk_process_text_memories(["Kept after failed delete"])[0]
+    
+    def fail(memory_ids):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(memory_processor, "_delete_memory_rows", fail)
+    
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(memory_processor.abulk_delete_memories([created["id"]]))
+    assert created["id"] in memory_processor.embedding_index
+
+def test_text_search_survives_rowid_renumbering(memory_processor):
+    """Test substring search still finds memories after their rowids change, as VACUUM may do"""
+    memory_processor.bulk_process_text_memories(["Pineapple picnic", "Quiet evening"])
+    memory_processor.conn.execute("UPDATE memories SET rowid = rowid + 100")
+    memory_processor.conn.commit()
+    
+    results = memory_processor.search_memories("apple")
+    assert [m["text"] for m in results] == ["Pineapple picnic"]
+
+def test_thread_connections_closed_on_thread_exit(memory_processor):
+    """Test short-lived threads do not leave their SQLite connections open"""
+    def worker():
+        memory_processor.conn.execute("SELECT COUNT(*) FROM memories").fetchone()
+    
+    for _ in range(10):
+        worker_thread = threading.Thread(target=worker)
+        worker_thread.start()
+        worker_thread.join()
+    
+    assert len(memory_processor._connections) == 1
@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+from memory_insights import InsightEngine
+
+def test_activity_trend_uses_date_order():
+    """Test the activity trend follows the calendar, not the input order"""
+    engine = InsightEngine(None)
+    start = datetime(2024, 1, 1)
+
+    # One more memory each day, returned newest first like the API does
+    memories = [
+        {"id": f"{day}-{n}", "text": "Daily note", "timestamp": (start + timedelta(days=day, hours=n)).isoformat()}
+        for day in range(7)
+        for n in range(day + 1)
+    ]
+    memories.reverse()
+
+    trends = [insight for insight in engine.generate_insights(memories) if insight.type == "activity_trend"]
+    assert len(trends) == 1
+    assert trends[0].message == "Memory creation is trending upward"
+    assert trends[0].data["trend_slope"] > 0